@@ -2,21 +2,27 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 import json
-import altair as alt
-import os
+from db_restore import ensure_database, needs_restore
+from page_shell import apply_theme, header, altair
+from kpis import component_kpis, latest_critical
 
 # === CONFIGURATION ===
 DB_PATH = "ga_maintenance.db"
 SQL_SEED_FILE = "full_pdm_seed.sql"
+IMAGE_PATH = "full_pdm_seed.db.gz"
 
 # === AUTOMATIC DB RESTORATION IF MISSING ===
-if not os.path.exists(DB_PATH):
-    st.warning("Database file not found. Attempting to restore from SQL seed...")
+# Normally done before the server starts (`python db_restore.py restore`);
+# this is the fallback, run once per process under a file lock.
+@st.cache_resource
+def restore_database():
+    return ensure_database(DB_PATH, IMAGE_PATH, SQL_SEED_FILE)
+
+if needs_restore(DB_PATH):
+    st.warning("Database file not found. Attempting to restore...")
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            with open(SQL_SEED_FILE, "r") as f:
-                conn.executescript(f.read())
-        st.success("Database successfully restored.")
+        source = restore_database()
+        st.success(f"Database successfully restored ({source}).")
     except Exception as e:
         st.error(f"Database restoration failed: {e}")
 
@@ -38,89 +44,20 @@ def validate_metrics(metrics_json):
     except:
         return False
 
-# === LOAD DATA ===
-components_df = load_df("""
-    SELECT component_id, tail_number, name, condition, remaining_useful_life, last_health_score
-    FROM components
-""")
-
-predictions_df = load_df("""
-    SELECT * FROM component_predictions
-    ORDER BY prediction_time DESC
-""")
-
-# === DARK MODE ===
-dark_mode = st.sidebar.checkbox("🌙 Enable Dark Mode")
-
-if dark_mode:
-    background_gradient = "linear-gradient(135deg, #121212, #2c3e50)"
-    card_bg = "#1e272e"
-    text_color = "#f1f1f1"
-    metric_bg = "#34495e"
-    button_bg = "#2980b9"
-else:
-    background_gradient = "linear-gradient(135deg, #e8f0f8, #ffffff)"
-    card_bg = "#ffffff"
-    text_color = "#333333"
-    metric_bg = "#00796b"
-    button_bg = "#1565c0"
+# === THEME + HEADER (drawn before any query runs) ===
+palette = apply_theme()
+metric_bg = palette["metric_bg"]
+header("General Aviation Predictive Maintenance Dashboard")
 
-st.markdown(f"""
-<style>
-.stApp {{
-    background: {background_gradient};
-    font-family: 'Segoe UI', sans-serif;
-    color: {text_color};
-}}
-.header-bar {{
-    background: {metric_bg};
-    padding: 15px;
-    border-radius: 10px;
-    color: white;
-    font-size: 26px;
-    font-weight: bold;
-    text-align: center;
-    box-shadow: 0 4px 20px rgba(0,0,0,0.4);
-    text-shadow: 1px 1px 3px rgba(0,0,0,0.8);
-}}
-.card {{
-    background: {card_bg};
-    color: {text_color};
-    padding: 15px;
-    border-radius: 12px;
-    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-    margin-bottom: 15px;
-}}
-.metric-card {{
-    background: {metric_bg};
-    padding: 12px;
-    border-radius: 10px;
-    color: #ffffff;
-    text-align: center;
-    box-shadow: 0 6px 15px rgba(0,0,0,0.3);
-}}
-.stButton > button {{
-    background-color: {button_bg};
-    color: white;
-    font-weight: bold;
-    border: none;
-    border-radius: 5px;
-    padding: 6px 12px;
-}}
-.stButton > button:hover {{
-    background-color: #004d99;
-}}
-textarea.stTextArea textarea {{
-    background-color: {"#2c3e50" if dark_mode else "#ffffff"};
-    color: {"#f1f1f1" if dark_mode else "#333333"};
-    border: 1px solid #888;
-    border-radius: 5px;
-    font-size: 14px;
-}}
-</style>
-""", unsafe_allow_html=True)
+# === LOAD DATA ===
+with st.spinner("Loading fleet data..."):
+    components_df = load_df("""
+        SELECT component_id, tail_number, name, condition, remaining_useful_life, last_health_score
+        FROM components
+    """)
 
-st.markdown('<div class="header-bar">General Aviation Predictive Maintenance Dashboard</div>', unsafe_allow_html=True)
+    # Per-component aggregates from SQL instead of the full prediction history
+    comp_kpis = component_kpis(DB_PATH).set_index("component_id")
 
 # === SELECTOR ===
 component_names = [f"{row['tail_number']} - {row['name']}" for _, row in components_df.iterrows()]
@@ -130,7 +67,7 @@ if component_names:
     selected_component = st.selectbox("Select Aircraft Component:", component_names)
     comp_id = component_map[selected_component]
     comp_data = components_df[components_df['component_id'] == comp_id].iloc[0]
-    comp_preds = predictions_df[predictions_df['component_id'] == comp_id]
+    comp_kpi = comp_kpis.loc[comp_id] if comp_id in comp_kpis.index else None
 
     col1, col2 = st.columns([2,1])
 
@@ -144,9 +81,8 @@ if component_names:
         </div>
         """, unsafe_allow_html=True)
 
-        crit = comp_preds[(comp_preds['prediction_type'] == 'failure') & (comp_preds['confidence'] > 0.9)]
-        if not crit.empty:
-            row = crit.iloc[0]
+        row = latest_critical(int(comp_id), DB_PATH)
+        if row is not None:
             st.markdown(f"""
             <div class="card" style="background:#e53935; color:white;">
             <b>⚠ Critical Alert</b><br>
@@ -163,10 +99,14 @@ if component_names:
             """, unsafe_allow_html=True)
 
         # Altair chart
-        if not comp_preds.empty:
-            alt_data = comp_preds[comp_preds['prediction_type'] == 'remaining_life']
+        if comp_kpi is not None:
+            alt_data = load_df(f"""
+                SELECT prediction_time, predicted_value, confidence FROM component_predictions
+                WHERE component_id = {comp_id} AND prediction_type = 'remaining_life'
+            """)
             if not alt_data.empty:
                 alt_data['prediction_time'] = pd.to_datetime(alt_data['prediction_time'])
+                alt = altair()
                 chart = alt.Chart(alt_data).mark_line(point=True).encode(
                     x=alt.X('prediction_time:T', title='Prediction Time'),
                     y=alt.Y('predicted_value:Q', title='Remaining Useful Life (hrs)'),
@@ -181,8 +121,8 @@ if component_names:
                 st.info("No remaining life predictions available for Altair chart.")
 
     with col2:
-        avg_conf = comp_preds['confidence'].mean() * 100 if not comp_preds.empty else 0
-        crit_count = crit.shape[0]
+        avg_conf = comp_kpi['avg_confidence'] * 100 if comp_kpi is not None else 0
+        crit_count = int(comp_kpi['critical_failures']) if comp_kpi is not None else 0
         avg_rul = comp_data['remaining_useful_life']
 
         st.markdown(f"""
@@ -207,8 +147,8 @@ if component_names:
         """, unsafe_allow_html=True)
 
         # Performance metrics
-        if not comp_preds.empty:
-            selected_model_id = comp_preds['model_id'].iloc[0]
+        if comp_kpi is not None:
+            selected_model_id = comp_kpi['latest_model_id']
             metrics_df = load_df(f"""
                 SELECT performance_metrics FROM predictive_models
                 WHERE model_id = {selected_model_id}
@@ -0,0 +1,316 @@
+# run_benchmarks.py
+"""Benchmark suite: ingest, dashboard queries, training prep, scoring and page render.
+
+For each fleet scale a fresh database is built with the sensor generator and
+the key paths are timed against it. Results are written as JSON; with
+``--compare`` they are checked against a saved baseline and the run exits
+non-zero when any metric regressed by more than ``--tolerance``.
+
+    python benchmarks/run_benchmarks.py --scales 10 1k --out bench.json
+    python benchmarks/run_benchmarks.py --scales 10 --compare bench.json
+
+Metric names end in ``_s``/``_ms`` (lower is better) or ``_per_s`` (higher
+is better); anything else is informational.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+import utils
+from generate_degrading_sensor_data import generate_degrading_sensor_data
+from startup import PAGES
+from sweep import TOP_PARAMS, prepare_dataset, window_index
+
+# scale name -> (components, records per parameter); rows = components * 10 params * records
+SCALES = {
+    "10": (10, 1000),        # 1e5 rows
+    "1k": (1000, 1000),      # 1e7 rows
+    "10k": (10000, 1000),    # 1e8 rows
+}
+GROUPS = ["ingest", "queries", "load_df", "training", "scoring", "pages"]
+
+DASHBOARD_QUERIES = {
+    "components_needing_attention": "SELECT * FROM components_needing_attention",
+    "dashboard_snapshot": "SELECT * FROM dashboard_snapshot_view",
+    "engine_health": "SELECT * FROM engine_health_view",
+    "due_preventive_tasks": "SELECT * FROM due_preventive_tasks ORDER BY timestamp DESC",
+    "latest_predictions": "SELECT * FROM component_predictions ORDER BY prediction_time DESC LIMIT 100",
+    "components": "SELECT component_id, tail_number, name, condition, remaining_useful_life, last_health_score FROM components",
+    "predictive_models": "SELECT model_id, model_name, model_type, performance_metrics FROM predictive_models",
+}
+
+# Used only when no SQL seed is available; the seed carries the real schema and views
+MINIMAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_data (
+    sensor_id INTEGER PRIMARY KEY AUTOINCREMENT, tail_number TEXT, component_id INTEGER,
+    parameter TEXT, value REAL, unit TEXT, timestamp TEXT, sensor_health INTEGER
+);
+CREATE TABLE IF NOT EXISTS components (
+    component_id INTEGER PRIMARY KEY, tail_number TEXT, name TEXT, condition TEXT,
+    remaining_useful_life REAL, last_health_score REAL
+);
+CREATE TABLE IF NOT EXISTS component_predictions (
+    prediction_id INTEGER PRIMARY KEY AUTOINCREMENT, component_id INTEGER, model_id INTEGER,
+    prediction_type TEXT, predicted_value REAL, confidence REAL, time_horizon TEXT,
+    explanation TEXT, prediction_time TEXT
+);
+CREATE TABLE IF NOT EXISTS predictive_models (
+    model_id INTEGER PRIMARY KEY AUTOINCREMENT, model_name TEXT, model_type TEXT,
+    version TEXT, created_at TEXT, performance_metrics TEXT
+);
+"""
+
+
+@contextmanager
+def timer(results, key):
+    t0 = time.perf_counter()
+    yield
+    results[key] = round(time.perf_counter() - t0, 4)
+
+
+# === FLEET SETUP ===
+def build_fleet(db_path, num_components, num_records, seed_path=None):
+    """Create a database for one scale and fill it with the sensor generator."""
+    results = {}
+    conn = sqlite3.connect(db_path)
+    if seed_path and os.path.exists(seed_path):
+        with open(seed_path) as f:
+            conn.executescript(f.read())
+    else:
+        conn.executescript(MINIMAL_SCHEMA)
+    conn.executemany("""
+        INSERT OR IGNORE INTO components
+            (component_id, tail_number, name, condition, remaining_useful_life, last_health_score)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(cid, f"N{cid:05d}", f"Component {cid}", "Serviceable",
+           random.uniform(10, 2000), random.uniform(0.5, 1.0))
+          for cid in range(1, num_components + 1)])
+    conn.commit()
+    conn.close()
+
+    rows = num_components * len(TOP_PARAMS) * num_records
+    with timer(results, "ingest_s"):
+        generate_degrading_sensor_data(db_path, TOP_PARAMS, num_components, num_records)
+    results["ingest_rows"] = rows
+    results["ingest_rows_per_s"] = round(rows / results["ingest_s"], 1)
+    return results
+
+
+# === BENCHMARK GROUPS ===
+def bench_queries(db_path):
+    results = {}
+    conn = sqlite3.connect(db_path)
+    for name, query in DASHBOARD_QUERIES.items():
+        try:
+            with timer(results, f"query_{name}_s"):
+                conn.execute(query).fetchall()
+        except sqlite3.OperationalError:
+            results.pop(f"query_{name}_s", None)
+            results[f"query_{name}"] = "missing"
+    conn.close()
+    return results
+
+
+def bench_load_df(db_path, calls=200):
+    utils.DB_PATH = db_path
+    utils.load_df("SELECT 1")
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        utils.load_df("SELECT component_id, remaining_useful_life FROM components LIMIT 10")
+    return {"load_df_roundtrip_ms": round((time.perf_counter() - t0) / calls * 1000, 3)}
+
+
+def bench_training(db_path, data_dir, seq_len=10):
+    results = {}
+    with timer(results, "training_pivot_s"):
+        prepare_dataset(db_path, data_dir)
+    features = np.load(os.path.join(data_dir, "features.npy"), mmap_mode="r")
+    starts = np.load(os.path.join(data_dir, "starts.npy"))
+    with timer(results, "training_window_s"):
+        win_start, _ = window_index(starts, seq_len)
+        windows = np.lib.stride_tricks.sliding_window_view(features, seq_len, axis=0)[win_start]
+    results["training_windows"] = int(len(windows))
+    return results
+
+
+def bench_scoring(db_path, data_dir, seq_len=10, train_rows=20000):
+    try:
+        from sklearn.ensemble import RandomForestRegressor
+    except ImportError:
+        return {"scoring": "skipped (scikit-learn not installed)"}
+
+    features = np.load(os.path.join(data_dir, "features.npy"), mmap_mode="r")
+    starts = np.load(os.path.join(data_dir, "starts.npy"))
+    comp_ids = np.load(os.path.join(data_dir, "comp_ids.npy"))
+    rul = np.load(os.path.join(data_dir, "rul.npy"))
+    win_start, comp_pos = window_index(starts, seq_len)
+    x = features[win_start + seq_len - 1]
+    sample = np.random.default_rng(0).choice(len(x), size=min(train_rows, len(x)), replace=False)
+    model = RandomForestRegressor(n_estimators=20, max_depth=10, n_jobs=-1, random_state=0)
+    model.fit(x[sample], rul[comp_pos[sample]])
+
+    results = {}
+    with timer(results, "scoring_predict_s"):
+        preds = model.predict(x)
+    # One prediction per component (its latest window), as the pipeline logs them
+    last = np.r_[np.flatnonzero(np.diff(comp_pos)), len(comp_pos) - 1]
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    records = [(int(comp_ids[comp_pos[i]]), 0, 'remaining_life', float(preds[i]), 0.85, '100h', 'benchmark', now)
+               for i in last]
+    with timer(results, "scoring_write_s"), sqlite3.connect(db_path) as conn:
+        conn.executemany("""
+            INSERT INTO component_predictions (
+                component_id, model_id, prediction_type, predicted_value,
+                confidence, time_horizon, explanation, prediction_time
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, records)
+    results["scoring_windows_per_s"] = round(len(x) / results["scoring_predict_s"], 1)
+    return results
+
+
+def bench_pages(db_path, workdir):
+    """Headless render of each page against this scale's database.
+
+    Runs in a fresh interpreter per scale: st.cache_resource (the task
+    scheduler), st.cache_data and kpis' shared connection would otherwise
+    carry the previous scale's database into this one's timings.
+    """
+    page_dir = os.path.join(workdir, "pages_cwd_" + os.path.splitext(os.path.basename(db_path))[0])
+    os.makedirs(page_dir, exist_ok=True)
+    for name, target in (("ga_maintenance.db", db_path), ("logo.png", os.path.join(ROOT, "logo.png"))):
+        link = os.path.join(page_dir, name)
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.abspath(target), link)
+
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--render-pages"],
+                          cwd=page_dir, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"pages": "failed: " + (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _render_pages():
+    """Child side of bench_pages: render every page from the current directory."""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    utils.DB_PATH = "ga_maintenance.db"
+    for page in PAGES:
+        key = "render_" + os.path.splitext(page.replace("/", "_"))[0]
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+        at.run()
+        # Time a rerun with auto-refresh off so the sleep isn't measured
+        for slider in at.sidebar.slider:
+            if slider.label.startswith("Auto-refresh"):
+                slider.set_value(0)
+        with timer(results, f"{key}_s"):
+            at.run()
+        if at.exception:
+            results[f"{key}_exceptions"] = len(at.exception)
+    return results
+
+
+def run_scale(scale, workdir, groups, seed_path=None):
+    num_components, num_records = SCALES[scale]
+    db_path = os.path.join(workdir, f"bench_{scale}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    print(f"=== Scale {scale}: {num_components} components x {num_records} records ===")
+
+    results = build_fleet(db_path, num_components, num_records, seed_path)
+    if "ingest" not in groups:
+        results = {"ingest_rows": results["ingest_rows"]}
+    if "queries" in groups:
+        results.update(bench_queries(db_path))
+    if "load_df" in groups:
+        results.update(bench_load_df(db_path))
+    data_dir = os.path.join(workdir, f"windows_{scale}")
+    if "training" in groups or "scoring" in groups:
+        results.update(bench_training(db_path, data_dir))
+    if "scoring" in groups:
+        results.update(bench_scoring(db_path, data_dir))
+    if "pages" in groups:
+        results.update(bench_pages(db_path, workdir))
+    for key, value in sorted(results.items()):
+        print(f"  {key:45s} {value}")
+    return results
+
+
+# === BASELINE COMPARISON ===
+def compare(current, baseline, tolerance=0.2):
+    """List (scale, metric, baseline, current, change) for regressions beyond ``tolerance``."""
+    regressions = []
+    for scale, metrics in current["scales"].items():
+        base_metrics = baseline.get("scales", {}).get(scale, {})
+        for key, value in metrics.items():
+            base = base_metrics.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or base == 0:
+                continue
+            if key.endswith("_per_s"):
+                change = (base - value) / base
+            elif key.endswith("_s") or key.endswith("_ms"):
+                change = (value - base) / base
+            else:
+                continue
+            if change > tolerance:
+                regressions.append((scale, key, base, value, change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the GA maintenance benchmark suite.")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["10"])
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--seed", default=os.path.join(ROOT, "full_pdm_seed.sql"),
+                        help="SQL seed providing the schema and views")
+    parser.add_argument("--workdir", help="Where to build databases (default: temp dir)")
+    parser.add_argument("--out", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown (0.2 = 20%%)")
+    parser.add_argument("--render-pages", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.render_pages:
+        print(json.dumps(_render_pages()))
+        sys.exit(0)
+
+    random.seed(0)
+    np.random.seed(0)
+    with tempfile.TemporaryDirectory(prefix="pdm_bench_") as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        report = {
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "scales": {scale: run_scale(scale, workdir, args.groups, args.seed) for scale in args.scales},
+        }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for scale, key, base, value, change in regressions:
+            print(f"❌ [{scale}] {key}: {base} -> {value} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
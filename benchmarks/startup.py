@@ -0,0 +1,120 @@
+# startup.py
+"""Cold and warm time-to-first-paint for each Streamlit page.
+
+Each page runs headless through Streamlit's AppTest in a fresh interpreter
+(cold: nothing imported or cached yet), then once more in the same process
+(warm). "First paint" is the time until the page enqueues its first element;
+"full run" is the time until the script finishes.
+
+Run from the repository root so relative paths (database, logo) resolve:
+
+    python benchmarks/startup.py --repeat 3 --out startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [
+    "app.py",
+    "home.py",
+    "pages/main.py",
+    "pages/model_monitor.py",
+    "pages/pdm_dashboard.py",
+    "pages/due_preventive_tasks.py",
+    "pages/fleet_analytics.py",
+]
+RUN_TIMEOUT = 60
+
+
+def _install_paint_hook(marks):
+    """Record when the first delta (visible element) is enqueued."""
+    try:
+        from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    except ImportError:
+        from streamlit.runtime.scriptrunner.script_run_context import ScriptRunContext
+
+    original = ScriptRunContext.enqueue
+
+    def enqueue(self, msg):
+        if "first_paint" not in marks and msg.HasField("delta"):
+            marks["first_paint"] = time.perf_counter()
+        return original(self, msg)
+
+    ScriptRunContext.enqueue = enqueue
+
+
+def measure_in_process(page, started):
+    """Run one page cold then warm; ``started`` is the interpreter start time."""
+    sys.path.insert(0, ROOT)
+    marks = {}
+    _install_paint_hook(marks)
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for phase in ("cold", "warm"):
+        marks.clear()
+        t0 = started if phase == "cold" else time.perf_counter()
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=RUN_TIMEOUT)
+        at.run()
+        done = time.perf_counter()
+        results[phase] = {
+            "first_paint": round(marks["first_paint"] - t0, 4) if "first_paint" in marks else None,
+            "full_run": round(done - t0, 4),
+            "exceptions": len(at.exception),
+        }
+    return results
+
+
+def measure(page, repeat=1):
+    """Spawn a fresh interpreter per repeat and aggregate the medians."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--single", page],
+            cwd=ROOT, capture_output=True, text=True, timeout=RUN_TIMEOUT * 3,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    summary = {}
+    for phase in ("cold", "warm"):
+        summary[phase] = {}
+        for metric in ("first_paint", "full_run"):
+            values = [r[phase][metric] for r in runs if r[phase][metric] is not None]
+            summary[phase][metric] = round(statistics.median(values), 4) if values else None
+        summary[phase]["exceptions"] = max(r[phase]["exceptions"] for r in runs)
+    return summary
+
+
+if __name__ == "__main__":
+    _started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Measure Streamlit page startup times.")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="Write results as JSON to this file")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(measure_in_process(args.single, _started)))
+        sys.exit(0)
+
+    results = {}
+    for page in args.pages:
+        results[page] = measure(page, args.repeat)
+        r = results[page]
+        if "error" in r:
+            print(f"{page:32s} ERROR {r['error']}")
+        else:
+            print(f"{page:32s} cold paint {r['cold']['first_paint']}s  warm paint {r['warm']['first_paint']}s  "
+                  f"cold run {r['cold']['full_run']}s  warm run {r['warm']['full_run']}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "pages": results}, f, indent=2)
@@ -0,0 +1,219 @@
+# compact_storage.py
+"""Dictionary-encoded storage for sensor_data.
+
+Moves sensor readings into ``sensor_data_compact``, where tail numbers,
+parameters and units are integer codes into small lookup tables and
+timestamps are integer epoch seconds. Indexes on the old table go with it;
+a single ``(component_id, ts)`` index replaces them for per-component and
+time-range lookups (including views over ``sensor_data``), while the
+training and rollup paths scan the whole table.
+``sensor_data`` becomes a view with the original columns, so views that read
+it keep working, and INSTEAD OF triggers keep existing writers (the
+generator, the ingest service) working unchanged.
+
+    python compact_storage.py --db ga_maintenance.db
+"""
+import argparse
+import sqlite3
+
+DB_PATH = "ga_maintenance.db"
+
+LOOKUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_params (
+    param_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sensor_units (
+    unit_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tails (
+    tail_id INTEGER PRIMARY KEY,
+    tail_number TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sensor_data_compact (
+    sensor_id INTEGER PRIMARY KEY,
+    tail_id INTEGER REFERENCES tails (tail_id),
+    component_id INTEGER,
+    param_id INTEGER NOT NULL REFERENCES sensor_params (param_id),
+    unit_id INTEGER REFERENCES sensor_units (unit_id),
+    value REAL,
+    ts INTEGER NOT NULL,
+    sensor_health INTEGER
+);
+"""
+
+# Text timestamps are naive local times; strftime('%s') / 'unixepoch' treat
+# them symmetrically, so the view returns exactly the string that was stored.
+VIEW_SCHEMA = """
+CREATE VIEW sensor_data AS
+SELECT s.sensor_id,
+       t.tail_number,
+       s.component_id,
+       p.name AS parameter,
+       s.value,
+       u.name AS unit,
+       strftime('%Y-%m-%d %H:%M:%S', s.ts, 'unixepoch') AS timestamp,
+       s.sensor_health
+FROM sensor_data_compact s
+JOIN sensor_params p ON p.param_id = s.param_id
+LEFT JOIN sensor_units u ON u.unit_id = s.unit_id
+LEFT JOIN tails t ON t.tail_id = s.tail_id;
+
+CREATE TRIGGER sensor_data_insert INSTEAD OF INSERT ON sensor_data
+BEGIN
+    INSERT OR IGNORE INTO sensor_params (name) VALUES (NEW.parameter);
+    INSERT OR IGNORE INTO sensor_units (name) SELECT NEW.unit WHERE NEW.unit IS NOT NULL;
+    INSERT OR IGNORE INTO tails (tail_number) SELECT NEW.tail_number WHERE NEW.tail_number IS NOT NULL;
+    INSERT INTO sensor_data_compact (sensor_id, tail_id, component_id, param_id, unit_id, value, ts, sensor_health)
+    VALUES (
+        NEW.sensor_id,
+        (SELECT tail_id FROM tails WHERE tail_number = NEW.tail_number),
+        NEW.component_id,
+        (SELECT param_id FROM sensor_params WHERE name = NEW.parameter),
+        (SELECT unit_id FROM sensor_units WHERE name = NEW.unit),
+        NEW.value,
+        CAST(strftime('%s', NEW.timestamp) AS INTEGER),
+        NEW.sensor_health
+    );
+END;
+
+CREATE TRIGGER sensor_data_delete INSTEAD OF DELETE ON sensor_data
+BEGIN
+    DELETE FROM sensor_data_compact WHERE sensor_id = OLD.sensor_id;
+END;
+"""
+
+# Built after the bulk copy, which is faster than maintaining it row by row
+INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_sensor_compact_component_ts
+    ON sensor_data_compact (component_id, ts)
+"""
+
+# Separate so databases migrated before it existed can pick it up
+UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS sensor_data_update INSTEAD OF UPDATE ON sensor_data
+BEGIN
+    INSERT OR IGNORE INTO sensor_params (name) VALUES (NEW.parameter);
+    INSERT OR IGNORE INTO sensor_units (name) SELECT NEW.unit WHERE NEW.unit IS NOT NULL;
+    INSERT OR IGNORE INTO tails (tail_number) SELECT NEW.tail_number WHERE NEW.tail_number IS NOT NULL;
+    UPDATE sensor_data_compact SET
+        sensor_id = NEW.sensor_id,
+        tail_id = (SELECT tail_id FROM tails WHERE tail_number = NEW.tail_number),
+        component_id = NEW.component_id,
+        param_id = (SELECT param_id FROM sensor_params WHERE name = NEW.parameter),
+        unit_id = (SELECT unit_id FROM sensor_units WHERE name = NEW.unit),
+        value = NEW.value,
+        ts = CAST(strftime('%s', NEW.timestamp) AS INTEGER),
+        sensor_health = NEW.sensor_health
+    WHERE sensor_id = OLD.sensor_id;
+END;
+"""
+
+
+def _statements(script):
+    """Split a script into single statements (trigger bodies stay intact)."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+
+def is_compact(conn):
+    """True when sensor_data is already the compatibility view."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'sensor_data'").fetchone()
+    return row is not None and row[0] == "view"
+
+
+def _dependent_views(conn):
+    return [name for (name,) in conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'view' AND name != 'sensor_data' AND sql LIKE '%sensor_data%'
+    """)]
+
+
+def migrate(conn, vacuum=True):
+    """Convert a plain sensor_data table into the compact layout.
+
+    Returns (rows moved, rows skipped); rows whose timestamp cannot be parsed
+    are skipped, as the training pipeline already discards them. The table is
+    copied and dropped rather than renamed: since SQLite 3.26 a rename also
+    rewrites views that read sensor_data to follow the old table.
+    """
+    if is_compact(conn):
+        conn.execute(UPDATE_TRIGGER)
+        conn.execute(INDEX_SQL)
+        conn.commit()
+        return 0, 0
+
+    triggers = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'sensor_data'"
+    )]
+    if triggers:
+        raise RuntimeError(f"Triggers on sensor_data would be lost by the migration: {', '.join(triggers)}")
+
+    conn.isolation_level = None
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for stmt in _statements(LOOKUP_SCHEMA):
+            conn.execute(stmt)
+        total = conn.execute("SELECT COUNT(*) FROM sensor_data").fetchone()[0]
+        conn.execute("""
+            INSERT OR IGNORE INTO sensor_params (name)
+            SELECT DISTINCT parameter FROM sensor_data WHERE parameter IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT OR IGNORE INTO sensor_units (name)
+            SELECT DISTINCT unit FROM sensor_data WHERE unit IS NOT NULL
+        """)
+        conn.execute("""
+            INSERT OR IGNORE INTO tails (tail_number)
+            SELECT DISTINCT tail_number FROM sensor_data WHERE tail_number IS NOT NULL
+        """)
+        moved = conn.execute("""
+            INSERT INTO sensor_data_compact (sensor_id, tail_id, component_id, param_id, unit_id, value, ts, sensor_health)
+            SELECT l.rowid, t.tail_id, l.component_id, p.param_id, u.unit_id, l.value,
+                   CAST(strftime('%s', l.timestamp) AS INTEGER), l.sensor_health
+            FROM sensor_data l
+            JOIN sensor_params p ON p.name = l.parameter
+            LEFT JOIN sensor_units u ON u.name = l.unit
+            LEFT JOIN tails t ON t.tail_number = l.tail_number
+            WHERE strftime('%s', l.timestamp) IS NOT NULL
+        """).rowcount
+        conn.execute("DROP TABLE sensor_data")
+        conn.execute(INDEX_SQL)
+        for stmt in _statements(VIEW_SCHEMA) + [UPDATE_TRIGGER]:
+            conn.execute(stmt)
+        # Every view over sensor_data must still compile, or nothing changes
+        for view in _dependent_views(conn):
+            conn.execute(f'SELECT * FROM "{view}" LIMIT 0')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = ""
+
+    if vacuum:
+        conn.execute("VACUUM")
+    return moved, total - moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert sensor_data to dictionary-encoded storage.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--no-vacuum", action="store_true")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if is_compact(conn):
+            print("sensor_data is already compact.")
+        else:
+            moved, skipped = migrate(conn, vacuum=not args.no_vacuum)
+            print(f"✅ Moved {moved} sensor readings to sensor_data_compact ({skipped} skipped).")
+    finally:
+        conn.close()
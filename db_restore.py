@@ -0,0 +1,155 @@
+# db_restore.py
+"""Cold-start restore of ga_maintenance.db from a prebuilt binary image.
+
+``build`` runs the SQL seed once (at build/container-create time), vacuums
+the result and writes it as a gzip image with a SHA-256 sidecar. ``restore``
+streams that image back to disk, verifying the checksum as it goes, and only
+falls back to executing the SQL dump when the image is missing or corrupt.
+Restores take an exclusive file lock, so concurrent first visitors wait for
+one rebuild instead of racing.
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+
+DB_PATH = "ga_maintenance.db"
+SQL_SEED_FILE = "full_pdm_seed.sql"
+IMAGE_PATH = "full_pdm_seed.db.gz"
+CHUNK_SIZE = 1 << 20
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock held on ``path`` for the duration of the block."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# === BUILD ===
+def build_image(seed_path=SQL_SEED_FILE, image_path=IMAGE_PATH):
+    """Execute the SQL seed into a fresh database and save it as a checksummed image."""
+    out_dir = os.path.dirname(os.path.abspath(image_path))
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        db_tmp = os.path.join(tmp, "seed.db")
+        conn = sqlite3.connect(db_tmp)
+        try:
+            with open(seed_path, "r") as f:
+                conn.executescript(f.read())
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+        # The checksum covers the uncompressed database, so restore can verify
+        # the bytes it actually writes
+        checksum = _sha256_file(db_tmp)
+        with open(db_tmp, "rb") as src, gzip.open(image_path + ".tmp", "wb", compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    os.replace(image_path + ".tmp", image_path)
+    with open(image_path + ".sha256", "w") as f:
+        f.write(checksum + "\n")
+    return checksum
+
+
+# === RESTORE ===
+def _restore_from_image(image_path, db_path):
+    with open(image_path + ".sha256") as f:
+        expected = f.read().strip()
+    tmp_path = db_path + ".restoring"
+    digest = hashlib.sha256()
+    with gzip.open(image_path, "rb") as src, open(tmp_path, "wb") as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            dst.write(chunk)
+    if digest.hexdigest() != expected:
+        os.remove(tmp_path)
+        raise ValueError(f"Checksum mismatch for {image_path}")
+    os.replace(tmp_path, db_path)
+
+
+def _restore_from_sql(seed_path, db_path):
+    tmp_path = db_path + ".restoring"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with open(seed_path, "r") as f:
+            conn.executescript(f.read())
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def needs_restore(db_path=DB_PATH):
+    """True when the database is missing or empty (e.g. left by a bare sqlite3.connect)."""
+    return not os.path.exists(db_path) or os.path.getsize(db_path) == 0
+
+
+def ensure_database(db_path=DB_PATH, image_path=IMAGE_PATH, seed_path=SQL_SEED_FILE):
+    """Restore ``db_path`` if it is missing or empty. Returns how it was obtained.
+
+    One of "existing", "image" or "sql".
+    """
+    if not needs_restore(db_path):
+        return "existing"
+    with file_lock(db_path + ".lock"):
+        # Another process may have finished the restore while we waited
+        if not needs_restore(db_path):
+            return "existing"
+        if os.path.exists(image_path) and os.path.exists(image_path + ".sha256"):
+            try:
+                _restore_from_image(image_path, db_path)
+                return "image"
+            except (OSError, EOFError, ValueError) as e:
+                print(f"Image restore failed ({e}); falling back to SQL seed.", file=sys.stderr)
+        _restore_from_sql(seed_path, db_path)
+        return "sql"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or restore the database image.")
+    parser.add_argument("command", choices=["build", "restore"])
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--seed", default=SQL_SEED_FILE)
+    parser.add_argument("--image", default=IMAGE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        checksum = build_image(args.seed, args.image)
+        print(f"✅ Built {args.image} (sha256 {checksum[:12]}…)")
+    else:
+        source = ensure_database(args.db, args.image, args.seed)
+        print(f"✅ Database ready ({source}).")
@@ -31,6 +31,8 @@ def generate_degrading_sensor_data(
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     base_time = datetime.now()
+    steps = np.arange(num_records)
+    timestamps_by_interval = {}  # identical for every component, so format once
 
     for comp_id in range(1, num_components + 1):
         tail_number = f"N{np.random.randint(10000, 99999)}"
@@ -40,50 +42,48 @@ def generate_degrading_sensor_data(
 
         for param in top_params:
             interval_sec = sampling_intervals.get(param, 60)  # default 60s
-            time_offset = 0  # seconds from base_time
+            if interval_sec not in timestamps_by_interval:
+                timestamps_by_interval[interval_sec] = [
+                    (base_time + timedelta(seconds=int(k) * interval_sec)).strftime('%Y-%m-%d %H:%M:%S')
+                    for k in steps
+                ]
+            timestamps = timestamps_by_interval[interval_sec]
 
-            for i in range(num_records):
-                # Accelerated degradation after failure_point
-                if i < failure_point:
-                    base_val = max((num_records - i) / num_records, 0)
-                else:
-                    base_val = max((num_records - i) / num_records, 0) * 0.5  # more rapid drop
+            # Accelerated degradation after failure_point
+            base_val = np.maximum((num_records - steps) / num_records, 0)
+            base_val = np.where(steps < failure_point, base_val, base_val * 0.5)  # more rapid drop
 
-                noise = np.random.normal(0, 0.05)
-                value = max(base_val + noise, 0) * 100
+            noise = np.random.normal(0, 0.05, num_records)
+            values = np.maximum(base_val + noise, 0) * 100
 
-                # Determine unit
-                if param in ['oil_press', 'hyd_press', 'brake_press', 'manifold_press']:
-                    unit = 'psi'
-                elif param in ['cht', 'oil_temp']:
-                    unit = '°C'
-                elif param == 'rpm':
-                    unit = 'rpm'
-                elif param == 'bus_voltage':
-                    unit = 'volts'
-                elif param == 'alternator_current':
-                    unit = 'amps'
-                else:
-                    unit = 'psi'
+            # Determine unit
+            if param in ['oil_press', 'hyd_press', 'brake_press', 'manifold_press']:
+                unit = 'psi'
+            elif param in ['cht', 'oil_temp']:
+                unit = '°C'
+            elif param == 'rpm':
+                unit = 'rpm'
+            elif param == 'bus_voltage':
+                unit = 'volts'
+            elif param == 'alternator_current':
+                unit = 'amps'
+            else:
+                unit = 'psi'
 
-                # Health classification based on thresholds
-                threshold = thresholds.get(param, 20)  # fallback threshold
-                sensor_health = 0 if value >= threshold else 1
+            # Health classification based on thresholds
+            threshold = thresholds.get(param, 20)  # fallback threshold
+            sensor_health = (values < threshold).astype(int)
 
-                timestamp = base_time + timedelta(seconds=time_offset)
-                time_offset += interval_sec
-
-                # Insert into DB
-                cursor.execute("""
-                    INSERT INTO sensor_data (
-                        tail_number, component_id, parameter,
-                        value, unit, timestamp, sensor_health
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    tail_number, comp_id, param, value, unit,
-                    timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    sensor_health
-                ))
+            # Insert the whole series for this component/parameter at once
+            cursor.executemany("""
+                INSERT INTO sensor_data (
+                    tail_number, component_id, parameter,
+                    value, unit, timestamp, sensor_health
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, zip(
+                [tail_number] * num_records, [comp_id] * num_records, [param] * num_records,
+                values.tolist(), [unit] * num_records, timestamps, sensor_health.tolist()
+            ))
 
     conn.commit()
     conn.close()
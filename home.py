@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 import json
-import altair as alt
 from utils import load_df, validate_metrics
+from page_shell import apply_theme, header
 
 DB_PATH = "ga_maintenance.db"
 
@@ -33,72 +33,30 @@ st.set_page_config(page_title="General Aviation Predictive Maintenance Dashboard
 # Sidebar navigation
 page = st.sidebar.radio("Navigation", ["Home", "Model Monitoring", "Predictive Maintenance Dashboard"])
 
-# Load the data
-components_df = load_df("""
-    SELECT component_id, tail_number, name, condition, remaining_useful_life, last_health_score
-    FROM components
-""")
-
-predictions_df = load_df("""
-    SELECT * FROM component_predictions
-    ORDER BY prediction_time DESC
-""")
-
 # Dark Mode Styling
-dark_mode = st.sidebar.checkbox("🌙 Enable Dark Mode")
-if dark_mode:
-    background_gradient = "linear-gradient(135deg, #121212, #2c3e50)"
-    card_bg = "#1e272e"
-    text_color = "#f1f1f1"
-    metric_bg = "#34495e"
-    button_bg = "#2980b9"
-else:
-    background_gradient = "linear-gradient(135deg, #e8f0f8, #ffffff)"
-    card_bg = "#ffffff"
-    text_color = "#333333"
-    metric_bg = "#00796b"
-    button_bg = "#1565c0"
-
-st.markdown(f"""
-<style>
-.stApp {{
-    background: {background_gradient};
-    font-family: 'Segoe UI', sans-serif;
-    color: {text_color};
-}}
-.header-bar {{
-    background: {metric_bg};
-    padding: 15px;
-    border-radius: 10px;
-    color: white;
-    font-size: 26px;
-    font-weight: bold;
-    text-align: center;
-    box-shadow: 0 4px 20px rgba(0,0,0,0.4);
-    text-shadow: 1px 1px 3px rgba(0,0,0,0.8);
-}}
-.card {{
-    background: {card_bg};
-    color: {text_color};
-    padding: 15px;
-    border-radius: 12px;
-    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-    margin-bottom: 15px;
-}}
-</style>
-""", unsafe_allow_html=True)
+apply_theme()
 
 # Home Page
 if page == "Home":
-    st.markdown("<div class='header-bar'>General Aviation Predictive Maintenance Dashboard</div>", unsafe_allow_html=True)
+    header("General Aviation Predictive Maintenance Dashboard")
     st.image("logo.png", width=200)
     st.write("Welcome to the **Predictive Maintenance Dashboard**!")
     st.write("Use the sidebar to navigate between different pages.")
 
 # Model Monitoring Page
 elif page == "Model Monitoring":
-    st.markdown("<div class='header-bar'>Model Monitoring</div>", unsafe_allow_html=True)
-    
+    header("Model Monitoring")
+
+    # Only this page needs the fleet tables, so query after the header is drawn
+    components_df = load_df("""
+        SELECT component_id, tail_number, name, condition, remaining_useful_life, last_health_score
+        FROM components
+    """)
+    predictions_df = load_df("""
+        SELECT * FROM component_predictions
+        ORDER BY prediction_time DESC
+    """)
+
     # Selector for components
     component_names = [f"{row['tail_number']} - {row['name']}" for _, row in components_df.iterrows()]
     component_map = {f"{row['tail_number']} - {row['name']}": row['component_id'] for _, row in components_df.iterrows()}
@@ -123,6 +81,6 @@ elif page == "Model Monitoring":
 
 # Predictive Maintenance Dashboard Page
 elif page == "Predictive Maintenance Dashboard":
-    st.markdown("<div class='header-bar'>Predictive Maintenance Dashboard</div>", unsafe_allow_html=True)
+    header("Predictive Maintenance Dashboard")
     st.write("This is where you would display your predictive maintenance dashboard.")
     # Add your content here for the predictive maintenance dashboard.
@@ -0,0 +1,400 @@
+# ingest_service.py
+"""Batched ingestion service for live sensor readings.
+
+Data loggers POST batches of readings to ``/readings`` over a small asyncio
+HTTP server. Readings are validated against the known parameters and units,
+queued in memory, and written to ``sensor_data`` by a single writer task in
+large transactions, so many uploaders never contend for the SQLite write
+lock. When the queue is full, uploads get ``503`` with ``Retry-After`` instead
+of piling up in memory. A transient write failure (e.g. the database is
+locked) puts the batch back at the head of the queue and is retried with
+backoff; until a write succeeds again the service reports itself unhealthy
+and turns uploads away with ``503``. Rows the database refuses outright
+(constraint violations) are split out and counted as rejected, so one bad
+reading cannot block the queue. ``GET /metrics`` reports throughput, queue depth and health.
+
+    python ingest_service.py --db ga_maintenance.db --port 8765
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+DB_PATH = "ga_maintenance.db"
+
+# Same parameters and units the sensor generator writes
+PARAM_UNITS = {
+    'cht': '°C',
+    'oil_temp': '°C',
+    'fuel_flow': 'psi',
+    'rpm': 'rpm',
+    'manifold_press': 'psi',
+    'oil_press': 'psi',
+    'hyd_press': 'psi',
+    'brake_press': 'psi',
+    'bus_voltage': 'volts',
+    'alternator_current': 'amps',
+}
+TOP_PARAMS = list(PARAM_UNITS)
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+MAX_QUEUE_ROWS = 200_000
+FLUSH_ROWS = 20_000
+FLUSH_INTERVAL = 0.5    # seconds; upper bound on how long a reading waits in memory
+MAX_RETRY_DELAY = 30.0  # seconds between write retries while the writer is failing
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+INSERT_SQL = """
+    INSERT INTO sensor_data (
+        tail_number, component_id, parameter,
+        value, unit, timestamp, sensor_health
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ValidationError(ValueError):
+    pass
+
+
+def validate_reading(r):
+    """Return the sensor_data row tuple for one reading, or raise ValidationError."""
+    try:
+        param = r["parameter"]
+        if param not in PARAM_UNITS:
+            raise ValidationError(f"unknown parameter {param!r}")
+        unit = r.get("unit", PARAM_UNITS[param])
+        if unit != PARAM_UNITS[param]:
+            raise ValidationError(f"unit {unit!r} invalid for {param} (expected {PARAM_UNITS[param]!r})")
+        value = float(r["value"])
+        timestamp = r.get("timestamp") or datetime.now().strftime(TIME_FORMAT)
+        # strptime accepts "2025-7-1 1:2:3", which SQLite's date functions don't
+        timestamp = datetime.strptime(timestamp, TIME_FORMAT).strftime(TIME_FORMAT)
+        return (str(r["tail_number"]), int(r["component_id"]), param, value, unit,
+                timestamp, int(r.get("sensor_health", 0)))
+    except ValidationError:
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValidationError(f"malformed reading: {e}") from e
+
+
+class IngestService:
+    """In-memory queue plus a single SQLite writer."""
+
+    def __init__(self, db_path=DB_PATH, max_queue_rows=MAX_QUEUE_ROWS,
+                 flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL,
+                 max_retry_delay=MAX_RETRY_DELAY):
+        self.db_path = db_path
+        self.max_queue_rows = max_queue_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max_retry_delay
+        self.failures = 0       # consecutive failed writes; 0 means healthy
+        self.last_error = None
+        self.last_write_rejection = None
+        self._pending = []
+        self._pending_rows = 0
+        self._wakeup = asyncio.Event()
+        self._writer_task = None
+        self._stopping = False
+        self._conn = None
+        self.started_at = time.monotonic()
+        self.stats = {
+            "accepted_rows": 0,
+            "rejected_rows": 0,
+            "throttled_batches": 0,
+            "written_rows": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "write_rejected_rows": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # === LIFECYCLE ===
+    async def start(self):
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL lets the dashboards keep reading while we write
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._writer_task = asyncio.create_task(self._writer())
+
+    async def stop(self):
+        """Flush everything still queued (one last attempt), then close the connection."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._writer_task:
+            await self._writer_task
+        if self._pending_rows:
+            print(f"⚠️ Dropping {self._pending_rows} unwritten readings: {self.last_error}")
+        self._conn.close()
+
+    @property
+    def healthy(self):
+        return self.failures == 0
+
+    def retry_delay(self):
+        """Seconds until the next write attempt: flush_interval, doubled per consecutive failure."""
+        if self.healthy:
+            return self.flush_interval
+        return min(self.flush_interval * 2 ** self.failures, self.max_retry_delay)
+
+    # === INGEST ===
+    def submit(self, readings):
+        """Validate and queue a batch. Returns (accepted, errors).
+
+        Raises OverflowError when the queue is full or the writer is failing.
+        """
+        if not self.healthy:
+            self.stats["throttled_batches"] += 1
+            raise OverflowError(f"writer unavailable: {self.last_error}")
+        rows, errors = [], []
+        for i, r in enumerate(readings):
+            try:
+                rows.append(validate_reading(r))
+            except ValidationError as e:
+                errors.append({"index": i, "error": str(e)})
+        if self._pending_rows + len(rows) > self.max_queue_rows:
+            self.stats["throttled_batches"] += 1
+            raise OverflowError("ingest queue full")
+        if rows:
+            self._pending.append(rows)
+            self._pending_rows += len(rows)
+            if self._pending_rows >= self.flush_rows:
+                self._wakeup.set()
+        self.stats["accepted_rows"] += len(rows)
+        self.stats["rejected_rows"] += len(errors)
+        return len(rows), errors
+
+    async def _writer(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.retry_delay())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+        await self._flush()
+
+    def _insert(self, rows):
+        with self._conn:
+            self._conn.executemany(INSERT_SQL, rows)
+
+    def _write(self, batches):
+        """Write the queued batches in one transaction.
+
+        Returns (rejected, unwritten, error). A constraint failure bisects the
+        batch so every good row is committed and only the offending rows come
+        back in ``rejected`` as (row, message). An OperationalError (locked,
+        busy, missing table) stops the write; the rows not yet committed come
+        back in ``unwritten`` for a retry.
+        """
+        pending = [[row for rows in batches for row in rows]]
+        rejected = []
+        while pending:
+            chunk = pending.pop()
+            try:
+                self._insert(chunk)
+            except sqlite3.OperationalError as e:
+                return rejected, chunk + [row for c in reversed(pending) for row in c], e
+            except sqlite3.Error as e:
+                if len(chunk) == 1:
+                    rejected.append((chunk[0], str(e)))
+                else:
+                    mid = len(chunk) // 2
+                    pending += [chunk[mid:], chunk[:mid]]
+        return rejected, [], None
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        batches, count = self._pending, self._pending_rows
+        self._pending, self._pending_rows = [], 0
+        t0 = time.perf_counter()
+        # Run the transaction off the event loop so uploads keep being accepted
+        rejected, unwritten, error = await asyncio.to_thread(self._write, batches)
+        if rejected:
+            self.stats["rejected_rows"] += len(rejected)
+            self.stats["write_rejected_rows"] += len(rejected)
+            self.last_write_rejection = rejected[-1][1]
+        written = count - len(rejected) - len(unwritten)
+        self.stats["written_rows"] += written
+        if error is not None:
+            # Requeue ahead of anything that arrived meanwhile
+            self._pending = [unwritten] + self._pending
+            self._pending_rows += len(unwritten)
+            self.failures += 1
+            self.last_error = str(error)
+            self.stats["failed_flushes"] += 1
+            return
+        self.failures = 0
+        self.last_error = None
+        elapsed = (time.perf_counter() - t0) * 1000
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = round(elapsed, 2)
+        self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed), 2)
+
+    def metrics(self):
+        uptime = time.monotonic() - self.started_at
+        return {
+            **self.stats,
+            "healthy": self.healthy,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+            "last_write_rejection": self.last_write_rejection,
+            "queue_depth_rows": self._pending_rows,
+            "queue_depth_batches": len(self._pending),
+            "uptime_s": round(uptime, 1),
+            "written_rows_per_s": round(self.stats["written_rows"] / uptime, 1) if uptime else 0.0,
+        }
+
+
+# === HTTP FRONT END ===
+def _response(status, body, extra_headers=()):
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+               503: "Service Unavailable"}
+    payload = json.dumps(body).encode()
+    head = [f"HTTP/1.1 {status} {reasons.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}", *extra_headers]
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + payload
+
+
+def _route(service, method, path, body):
+    if method == "GET" and path == "/metrics":
+        return _response(200 if service.healthy else 503, service.metrics())
+    if method == "POST" and path == "/readings":
+        try:
+            data = json.loads(body or b"null")
+            readings = data["readings"] if isinstance(data, dict) else data
+            if not isinstance(readings, list):
+                raise TypeError("expected a list of readings")
+        except (ValueError, KeyError, TypeError) as e:
+            return _response(400, {"error": f"invalid body: {e}"})
+        try:
+            accepted, errors = service.submit(readings)
+        except OverflowError as e:
+            return _response(503, {"error": str(e)},
+                             [f"Retry-After: {max(int(service.retry_delay()), 1)}"])
+        return _response(200, {"accepted": accepted, "rejected": len(errors), "errors": errors[:20]})
+    return _response(404, {"error": "not found"})
+
+
+async def _handle(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                writer.write(_response(413, {"error": "batch too large"}))
+                await writer.drain()
+                break
+            body = await reader.readexactly(length) if length else b""
+            writer.write(_route(service, method, path, body))
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(db_path=DB_PATH, host="127.0.0.1", port=8765, **service_kwargs):
+    service = IngestService(db_path, **service_kwargs)
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: _handle(service, r, w), host, port)
+    print(f"✅ Ingest service listening on http://{host}:{port} (db: {db_path})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+# === CLIENTS ===
+class IngestClient:
+    """Minimal keep-alive HTTP client for data loggers and load tests."""
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host, self.port = host, port
+        self._reader = self._writer = None
+
+    async def _request(self, method, path, payload=None):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self._reader.readexactly(length))
+
+    async def send(self, readings):
+        return await self._request("POST", "/readings", {"readings": readings})
+
+    async def metrics(self):
+        return (await self._request("GET", "/metrics"))[1]
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class LocalClient:
+    """Stand-in for IngestClient that calls the service in-process (no sockets)."""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def send(self, readings):
+        try:
+            accepted, errors = self.service.submit(readings)
+        except OverflowError as e:
+            return 503, {"error": str(e)}
+        return 200, {"accepted": accepted, "rejected": len(errors), "errors": errors[:20]}
+
+    async def metrics(self):
+        return self.service.metrics()
+
+    async def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the sensor ingestion service.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--flush-rows", type=int, default=FLUSH_ROWS)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--max-queue-rows", type=int, default=MAX_QUEUE_ROWS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, flush_rows=args.flush_rows,
+                          flush_interval=args.flush_interval, max_queue_rows=args.max_queue_rows))
+    except KeyboardInterrupt:
+        pass
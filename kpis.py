@@ -0,0 +1,212 @@
+# kpis.py
+"""Fleet KPI aggregates for the dashboard metric cards and alert banners.
+
+Aggregates (per component, per tail, fleet-wide, over optional time windows)
+are computed with GROUP BY queries against a covering index on
+component_predictions, and cached in-process until the prediction table's
+data version changes. Cards render from these few rows instead of pulling
+the full prediction history into pandas.
+
+The index and the trigger-maintained version counter are created by the
+setup step, not on the read path:
+
+    python kpis.py --db ga_maintenance.db
+"""
+import argparse
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DB_PATH = "ga_maintenance.db"
+CRITICAL_CONFIDENCE = 0.9
+
+SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_predictions_kpi
+    ON component_predictions (component_id, prediction_time, prediction_type, confidence, model_id);
+
+CREATE TABLE IF NOT EXISTS kpi_data_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO kpi_data_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS kpi_version_insert AFTER INSERT ON component_predictions
+BEGIN
+    UPDATE kpi_data_version SET version = version + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS kpi_version_update AFTER UPDATE ON component_predictions
+BEGIN
+    UPDATE kpi_data_version SET version = version + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS kpi_version_delete AFTER DELETE ON component_predictions
+BEGIN
+    UPDATE kpi_data_version SET version = version + 1 WHERE id = 1;
+END;
+"""
+
+_cache = {}
+_cache_lock = threading.Lock()
+_connections = {}   # db_path -> (connection, lock); shared by all sessions
+
+
+def ensure_schema(conn):
+    """Create the KPI index and the version counter with its triggers."""
+    conn.executescript(SCHEMA)
+
+
+def _query(db_path, fn):
+    """Run fn(conn) on the shared read connection for db_path."""
+    with _cache_lock:
+        if db_path not in _connections:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            _connections[db_path] = (conn, threading.Lock())
+        conn, lock = _connections[db_path]
+    with lock:
+        return fn(conn)
+
+
+def _one_dict(cur):
+    row = cur.fetchone()
+    return dict(zip([d[0] for d in cur.description], row)) if row else None
+
+
+def data_version(db_path=DB_PATH):
+    """Counter bumped by triggers on every change to component_predictions.
+
+    None when the setup step has not run; results are then not cached.
+    """
+    def read(conn):
+        try:
+            return conn.execute("SELECT version FROM kpi_data_version WHERE id = 1").fetchone()[0]
+        except (sqlite3.OperationalError, TypeError):
+            return None
+    return _query(db_path, read)
+
+
+def _since(window_hours):
+    if window_hours is None:
+        return ""
+    # Minute resolution, so windowed results stay cacheable within a minute
+    return (datetime.now() - timedelta(hours=window_hours)).strftime("%Y-%m-%d %H:%M:00")
+
+
+def _cached(name, db_path, args, compute):
+    """Return compute(conn) cached per (query, args, data version)."""
+    version = data_version(db_path)
+    key = (name, db_path, args)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if version is not None and hit is not None and hit[0] == version:
+            return hit[1]
+    value = _query(db_path, compute)
+    if version is not None:
+        with _cache_lock:
+            _cache[key] = (version, value)
+    return value
+
+
+# === AGGREGATES ===
+COMPONENT_SQL = """
+SELECT p.component_id,
+       COUNT(*) AS predictions,
+       AVG(p.confidence) AS avg_confidence,
+       SUM(p.prediction_type = 'failure' AND p.confidence > :critical) AS critical_failures,
+       MAX(p.prediction_time) AS latest_prediction_time,
+       (SELECT p2.model_id FROM component_predictions p2
+         WHERE p2.component_id = p.component_id
+         ORDER BY p2.prediction_time DESC LIMIT 1) AS latest_model_id
+FROM component_predictions p
+WHERE (:since = '' OR p.prediction_time >= :since)
+GROUP BY p.component_id
+"""
+
+TAIL_SQL = """
+SELECT c.tail_number,
+       COUNT(DISTINCT c.component_id) AS components,
+       COUNT(p.component_id) AS predictions,
+       AVG(p.confidence) AS avg_confidence,
+       COALESCE(SUM(p.prediction_type = 'failure' AND p.confidence > :critical), 0) AS critical_failures,
+       MIN(c.remaining_useful_life) AS min_remaining_useful_life
+FROM components c
+LEFT JOIN component_predictions p
+  ON p.component_id = c.component_id AND (:since = '' OR p.prediction_time >= :since)
+GROUP BY c.tail_number
+"""
+
+FLEET_SQL = """
+SELECT COUNT(*) AS predictions,
+       AVG(confidence) AS avg_confidence,
+       COALESCE(SUM(prediction_type = 'failure' AND confidence > :critical), 0) AS critical_failures,
+       COUNT(DISTINCT CASE WHEN prediction_type = 'failure' AND confidence > :critical
+                           THEN component_id END) AS critical_components
+FROM component_predictions
+WHERE (:since = '' OR prediction_time >= :since)
+"""
+
+TIMESERIES_SQL = """
+SELECT substr(prediction_time, 1, :width) AS period,
+       COUNT(*) AS predictions,
+       AVG(confidence) AS avg_confidence,
+       SUM(prediction_type = 'failure' AND confidence > :critical) AS critical_failures
+FROM component_predictions
+WHERE (:since = '' OR prediction_time >= :since)
+GROUP BY period
+ORDER BY period
+"""
+
+
+def component_kpis(db_path=DB_PATH, window_hours=None):
+    """One row per component: prediction count, avg confidence, critical count, latest model."""
+    args = {"critical": CRITICAL_CONFIDENCE, "since": _since(window_hours)}
+    return _cached("component", db_path, args["since"],
+                   lambda conn: pd.read_sql_query(COMPONENT_SQL, conn, params=args))
+
+
+def tail_kpis(db_path=DB_PATH, window_hours=None):
+    """One row per tail number, including the lowest remaining useful life on the aircraft."""
+    args = {"critical": CRITICAL_CONFIDENCE, "since": _since(window_hours)}
+    return _cached("tail", db_path, args["since"],
+                   lambda conn: pd.read_sql_query(TAIL_SQL, conn, params=args))
+
+
+def fleet_kpis(db_path=DB_PATH, window_hours=None):
+    """Fleet-wide totals as a dict."""
+    args = {"critical": CRITICAL_CONFIDENCE, "since": _since(window_hours)}
+
+    def compute(conn):
+        return _one_dict(conn.execute(FLEET_SQL, args))
+
+    return _cached("fleet", db_path, args["since"], compute)
+
+
+def kpi_timeseries(db_path=DB_PATH, bucket="day", window_hours=None):
+    """Fleet KPIs bucketed by 'hour', 'day' or 'month' of prediction_time."""
+    widths = {"hour": 13, "day": 10, "month": 7}
+    args = {"critical": CRITICAL_CONFIDENCE, "since": _since(window_hours), "width": widths[bucket]}
+    return _cached("timeseries", db_path, (bucket, args["since"]),
+                   lambda conn: pd.read_sql_query(TIMESERIES_SQL, conn, params=args))
+
+
+def latest_critical(component_id, db_path=DB_PATH):
+    """The most recent critical failure prediction for a component, or None."""
+    def compute(conn):
+        return _one_dict(conn.execute("""
+            SELECT * FROM component_predictions
+            WHERE component_id = ? AND prediction_type = 'failure' AND confidence > ?
+            ORDER BY prediction_time DESC LIMIT 1
+        """, (component_id, CRITICAL_CONFIDENCE)))
+
+    return _cached("latest_critical", db_path, component_id, compute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the KPI index and data version counter.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    # mode=rw: fail on a missing database instead of creating an empty one
+    with sqlite3.connect(f"file:{args.db}?mode=rw", uri=True) as conn:
+        ensure_schema(conn)
+    print(f"✅ KPI index and version counter ready in {args.db}.")
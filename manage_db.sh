@@ -5,7 +5,7 @@ LOG="cron_backup.log"
 
 echo "=== Backup started at $(date) ===" >> $LOG
 mkdir -p "$BACKUP_DIR"
-timestamp=$(date +%Y%m%d_%H%M%S)
-cp "$DB" "$BACKUP_DIR/ga_maintenance_$timestamp.db" && \
-echo "Success: Created $BACKUP_DIR/ga_maintenance_$timestamp.db" >> $LOG || \
+# Online backup via the SQLite backup API; safe while writers are active
+python3 "$(dirname "$0")/scripts/backup_db.py" copy --db "$DB" --dest "$BACKUP_DIR" >> $LOG 2>&1 && \
+echo "Success: Backup completed" >> $LOG || \
 echo "Error: Backup failed" >> $LOG
@@ -0,0 +1,127 @@
+# page_shell.py
+"""Shared page shell: theme CSS, header bar and lazily imported chart libraries.
+
+Pages call ``apply_theme()`` and ``header()`` before running any queries so
+the layout paints first. The chart libraries (matplotlib, seaborn and
+altair) are only imported the first time a page actually draws a chart.
+"""
+import functools
+import importlib
+
+import streamlit as st
+
+PALETTES = {
+    False: {
+        "background_gradient": "linear-gradient(135deg, #e8f0f8, #ffffff)",
+        "card_bg": "#ffffff",
+        "text_color": "#333333",
+        "metric_bg": "#00796b",
+        "button_bg": "#1565c0",
+        "input_bg": "#ffffff",
+    },
+    True: {
+        "background_gradient": "linear-gradient(135deg, #121212, #2c3e50)",
+        "card_bg": "#1e272e",
+        "text_color": "#f1f1f1",
+        "metric_bg": "#34495e",
+        "button_bg": "#2980b9",
+        "input_bg": "#2c3e50",
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def theme_css(dark_mode=False):
+    """The <style> block for a mode; built once per process."""
+    p = PALETTES[bool(dark_mode)]
+    return f"""
+<style>
+.stApp {{
+    background: {p['background_gradient']};
+    font-family: 'Segoe UI', sans-serif;
+    color: {p['text_color']};
+}}
+.header-bar {{
+    background: {p['metric_bg']};
+    padding: 15px;
+    border-radius: 10px;
+    color: white;
+    font-size: 26px;
+    font-weight: bold;
+    text-align: center;
+    box-shadow: 0 4px 20px rgba(0,0,0,0.4);
+    text-shadow: 1px 1px 3px rgba(0,0,0,0.8);
+}}
+.card {{
+    background: {p['card_bg']};
+    color: {p['text_color']};
+    padding: 15px;
+    border-radius: 12px;
+    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
+    margin-bottom: 15px;
+}}
+.metric-card {{
+    background: {p['metric_bg']};
+    padding: 12px;
+    border-radius: 10px;
+    color: #ffffff;
+    text-align: center;
+    box-shadow: 0 6px 15px rgba(0,0,0,0.3);
+}}
+.stButton > button {{
+    background-color: {p['button_bg']};
+    color: white;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+    padding: 6px 12px;
+}}
+.stButton > button:hover {{
+    background-color: #004d99;
+}}
+textarea.stTextArea textarea {{
+    background-color: {p['input_bg']};
+    color: {p['text_color']};
+    border: 1px solid #888;
+    border-radius: 5px;
+    font-size: 14px;
+}}
+</style>
+"""
+
+
+def apply_theme(dark_mode=None):
+    """Inject the theme CSS and return the palette.
+
+    Shows the sidebar dark-mode toggle unless ``dark_mode`` is given.
+    """
+    if dark_mode is None:
+        dark_mode = st.sidebar.checkbox("🌙 Enable Dark Mode")
+    st.markdown(theme_css(bool(dark_mode)), unsafe_allow_html=True)
+    return PALETTES[bool(dark_mode)]
+
+
+def header(title):
+    st.markdown(f'<div class="header-bar">{title}</div>', unsafe_allow_html=True)
+
+
+# === LAZY CHART LIBRARIES ===
+@functools.lru_cache(maxsize=None)
+def _import(name):
+    return importlib.import_module(name)
+
+
+def pyplot():
+    """matplotlib.pyplot with the non-interactive Agg back end."""
+    matplotlib = _import("matplotlib")
+    matplotlib.use("Agg")
+    return _import("matplotlib.pyplot")
+
+
+def seaborn():
+    pyplot()
+    return _import("seaborn")
+
+
+def altair():
+    return _import("altair")
@@ -1,46 +1,56 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
+from scheduler import TaskScheduler
 
 DB_PATH = "ga_maintenance.db"
 
 st.title("🛠 Due Preventive Maintenance Tasks (FAA-Aligned)")
 
-# Load data from the view
-@st.cache_data
-def load_due_tasks():
-    with sqlite3.connect(DB_PATH) as conn:
-        query = """
-        SELECT * FROM due_preventive_tasks
-        ORDER BY timestamp DESC
-        """
-        return pd.read_sql_query(query, conn)
+# Shared across sessions; sync() only reloads tails touched since the last view
+@st.cache_resource
+def get_scheduler():
+    return TaskScheduler(DB_PATH)
+
+scheduler = get_scheduler()
+scheduler.sync()
 
 # Display section
-tasks_df = load_due_tasks()
+st.sidebar.subheader("⏱ Urgency")
+top_n = st.sidebar.number_input("Most urgent tasks to show", 1, 500, 50)
+top_df = pd.DataFrame(scheduler.top(int(top_n)))
 
-if tasks_df.empty:
+if top_df.empty:
     st.info("✅ No pending preventive maintenance tasks at this time.")
 else:
-    st.write(f"### 🔧 {len(tasks_df)} Task(s) Requiring Attention")
-    st.dataframe(tasks_df)
+    st.write(f"### 🔧 {len(scheduler)} Task(s) Requiring Attention")
+    st.caption(f"Showing the {len(top_df)} most urgent.")
+    st.dataframe(top_df)
+
+    # Filters and the download cover every due task, not just the top N
+    tasks_df = pd.DataFrame(scheduler.top(len(scheduler)))
 
     # Optional filtering by system or aircraft
     st.sidebar.subheader("🔍 Filter Tasks")
     systems = ["All"] + sorted(tasks_df['system'].dropna().unique().tolist())
     selected_system = st.sidebar.selectbox("System", systems)
 
-    tails = ["All"] + sorted(tasks_df['tail_number'].dropna().unique().tolist())
+    tails = ["All"] + scheduler.tails()
     selected_tail = st.sidebar.selectbox("Tail Number", tails)
 
+    if selected_tail != "All":
+        tasks_df = pd.DataFrame(scheduler.for_tail(selected_tail), columns=tasks_df.columns)
     if selected_system != "All":
         tasks_df = tasks_df[tasks_df['system'] == selected_system]
-    if selected_tail != "All":
-        tasks_df = tasks_df[tasks_df['tail_number'] == selected_tail]
 
     st.write("### Filtered View")
     st.dataframe(tasks_df)
 
+    if selected_tail != "All":
+        horizon = st.sidebar.slider("Due within (hours)", 1, 720, 100)
+        upcoming_df = pd.DataFrame(scheduler.due_within(selected_tail, horizon))
+        st.write(f"### Due for {selected_tail} in the next {horizon}h")
+        st.dataframe(upcoming_df)
+
     # Optional download
     st.download_button(
         label="📥 Download CSV",
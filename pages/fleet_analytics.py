@@ -0,0 +1,109 @@
+import streamlit as st
+from datetime import datetime, timedelta
+from utils import analytics_available, analytics_query
+from page_shell import apply_theme, header, altair
+
+DB_PATH = "ga_maintenance.db"
+
+apply_theme()
+header("Fleet Analytics")
+
+if not analytics_available():
+    st.info("Fleet analytics runs on the optional DuckDB engine. Install it with `pip install duckdb`.")
+    st.stop()
+
+st.caption("Queries run in DuckDB against a read-only view of the database, so they don't hold up the dashboards.")
+
+DISTRIBUTION_SQL = """
+SELECT tail_number,
+       date_trunc('month', "timestamp") AS month,
+       count(*) AS readings,
+       min(value) AS min,
+       quantile_cont(value, 0.05) AS p05,
+       quantile_cont(value, 0.5) AS median,
+       quantile_cont(value, 0.95) AS p95,
+       max(value) AS max
+FROM sensor_data
+WHERE parameter = $parameter AND "timestamp" >= $since
+GROUP BY ALL
+ORDER BY tail_number, month
+"""
+
+# Per-component mean/spread of each parameter against remaining useful life;
+# a strong negative correlation means higher readings go with earlier failure
+CORRELATION_SQL = """
+WITH per_component AS (
+    SELECT component_id, parameter, avg(value) AS mean_value, stddev_samp(value) AS std_value
+    FROM sensor_data
+    GROUP BY ALL
+)
+SELECT p.parameter,
+       corr(p.mean_value, c.remaining_useful_life) AS corr_mean_rul,
+       corr(p.std_value, c.remaining_useful_life) AS corr_std_rul,
+       count(*) AS components
+FROM per_component p
+JOIN components c USING (component_id)
+WHERE c.remaining_useful_life IS NOT NULL
+GROUP BY p.parameter
+ORDER BY abs(corr_mean_rul) DESC NULLS LAST
+"""
+
+
+@st.cache_data(ttl=600, show_spinner="Running analytics query...")
+def run_query(query, params=None):
+    return analytics_query(query, params, db_path=DB_PATH)
+
+
+def show(query, params=None):
+    try:
+        return run_query(query, params)
+    except Exception as e:
+        st.error(f"Analytics query failed: {e}")
+        st.stop()
+
+
+# === PARAMETER DISTRIBUTION PER TAIL ===
+st.subheader("📈 Parameter Distribution per Tail")
+parameters = show("SELECT DISTINCT parameter FROM sensor_data ORDER BY parameter")["parameter"].tolist()
+col1, col2 = st.columns(2)
+parameter = col1.selectbox("Parameter", parameters, index=parameters.index("cht") if "cht" in parameters else 0)
+days = col2.number_input("Look back (days)", 1, 3650, 365)
+# Day resolution keeps the cached result valid across reruns
+since = (datetime.now() - timedelta(days=int(days))).replace(hour=0, minute=0, second=0, microsecond=0)
+
+dist_df = show(DISTRIBUTION_SQL, {"parameter": parameter, "since": since})
+if dist_df.empty:
+    st.info("No readings for this parameter in the selected window.")
+else:
+    alt = altair()
+    band = alt.Chart(dist_df).mark_area(opacity=0.25).encode(
+        x=alt.X("month:T", title="Month"),
+        y=alt.Y("p05:Q", title=parameter),
+        y2="p95:Q",
+        color="tail_number:N",
+    )
+    median = alt.Chart(dist_df).mark_line(point=True).encode(
+        x="month:T",
+        y="median:Q",
+        color=alt.Color("tail_number:N", title="Tail"),
+        tooltip=["tail_number", "month:T", "readings", "p05", "median", "p95"],
+    )
+    st.altair_chart((band + median).properties(height=350), use_container_width=True)
+    st.dataframe(dist_df, use_container_width=True)
+
+# === EARLY FAILURE CORRELATION ===
+st.subheader("🔗 Parameters Correlated with Early Failure")
+corr_df = show(CORRELATION_SQL)
+if corr_df.empty:
+    st.info("No components with a remaining useful life estimate yet.")
+else:
+    st.dataframe(corr_df, use_container_width=True)
+
+# === AD-HOC QUERY ===
+with st.expander("🧪 Ad-hoc query"):
+    st.caption("Queries can only read the fleet database: file access, ATTACH and extensions are disabled. "
+               "`sensor_data` has a parsed timestamp; all other tables keep their SQLite names.")
+    query = st.text_area("SQL", "SELECT tail_number, parameter, count(*) AS readings\n"
+                                "FROM sensor_data\nGROUP BY ALL\nORDER BY readings DESC\nLIMIT 50")
+    if st.button("Run query"):
+        st.dataframe(show(query), use_container_width=True)
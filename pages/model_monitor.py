@@ -2,48 +2,43 @@ import streamlit as st
 import pandas as pd
 import json
 from utils import load_df, validate_metrics
+from page_shell import apply_theme
 
 st.set_page_config(page_title="Model Monitoring", layout="wide")
 
 # === STYLING ===
-dark_mode = st.sidebar.checkbox("🌙 Enable Dark Mode")
-
-if dark_mode:
-    background = "linear-gradient(135deg, #121212, #2c3e50)"
-    text_color = "#f1f1f1"
-    card_color = "#1e272e"
-else:
-    background = "linear-gradient(135deg, #e8f0f8, #ffffff)"
-    text_color = "#333333"
-    card_color = "#ffffff"
-
-st.markdown(f"""
-<style>
-.stApp {{
-    background: {background};
-    color: {text_color};
-    font-family: 'Segoe UI', sans-serif;
-}}
-.card {{
-    background: {card_color};
-    padding: 20px;
-    border-radius: 12px;
-    box-shadow: 0 4px 20px rgba(0,0,0,0.2);
-    margin-bottom: 20px;
-}}
-</style>
-""", unsafe_allow_html=True)
+apply_theme()
 
 # === TITLE ===
 st.markdown("<div class='card'><h2>📊 Predictive Model Monitoring Dashboard</h2></div>", unsafe_allow_html=True)
 
 # === LOAD DATA ===
-model_df = load_df("SELECT model_id, model_name, model_type AS algorithm, performance_metrics FROM predictive_models ORDER BY model_id DESC")
+# Sweep runs have their own leaderboard below and no classification metrics
+model_df = load_df("""
+    SELECT model_id, model_name, model_type AS algorithm, performance_metrics
+    FROM predictive_models
+    WHERE model_type IS NOT 'sweep'
+    ORDER BY model_id DESC
+""")
 
 # === DISPLAY MODEL TABLE ===
 st.subheader("Available Models")
 st.dataframe(model_df[["model_id", "model_name", "algorithm"]])
 
+# === SWEEP LEADERBOARD ===
+sweep_df = load_df("SELECT model_id, model_name, version AS sweep_id, performance_metrics FROM predictive_models WHERE model_type = 'sweep'")
+
+if not sweep_df.empty:
+    st.subheader("Sweep Leaderboard")
+    metrics_cols = pd.json_normalize(sweep_df["performance_metrics"].map(json.loads).tolist())
+    leaderboard = pd.concat([sweep_df.drop(columns="performance_metrics"), metrics_cols], axis=1)
+    sweep_ids = sorted(leaderboard["sweep_id"].astype(str).unique(), reverse=True)
+    selected_sweep = st.selectbox("Sweep", sweep_ids)
+    rank_by = st.selectbox("Rank by", ["rmse", "mae", "r2", "fit_seconds"])
+    leaderboard = leaderboard[leaderboard["sweep_id"].astype(str) == selected_sweep]
+    leaderboard = leaderboard.sort_values(rank_by, ascending=(rank_by != "r2"), na_position="last")
+    st.dataframe(leaderboard[["model_id", "model_name", "rmse", "mae", "r2", "fit_seconds", "predict_seconds"]])
+
 # === METRIC EXPLORATION ===
 selected_model = st.selectbox("Select Model to View Metrics", model_df["model_id"])
 metrics_json = model_df[model_df["model_id"] == selected_model]["performance_metrics"].values[0]
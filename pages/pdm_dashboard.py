@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-import matplotlib.pyplot as plt
-import seaborn as sns
+from page_shell import pyplot, seaborn
+from kpis import CRITICAL_CONFIDENCE, fleet_kpis
 import time
 
 # === CONFIG ===
@@ -16,6 +16,7 @@ def load_data(query):
     return df
 
 def plot_rul_bar(df):
+    plt, sns = pyplot(), seaborn()
     fig, ax = plt.subplots(figsize=(10, 5))
     sns.barplot(data=df, x=df['component_id'].astype(str), y='predicted_value', ax=ax, palette='Blues')
     ax.set_xlabel("Component ID")
@@ -25,6 +26,7 @@ def plot_rul_bar(df):
     st.pyplot(fig)
 
 def plot_confidence_rul(df):
+    plt, sns = pyplot(), seaborn()
     fig, ax = plt.subplots(figsize=(10, 5))
     sns.scatterplot(data=df, x='component_id', y='predicted_value', size='confidence', hue='confidence',
                     palette='coolwarm', ax=ax, sizes=(50, 300))
@@ -34,6 +36,7 @@ def plot_confidence_rul(df):
 
 def plot_rul_trend(df):
     if 'prediction_time' in df.columns:
+        plt, sns = pyplot(), seaborn()
         df['prediction_time'] = pd.to_datetime(df['prediction_time'], errors='coerce')
         fig, ax = plt.subplots(figsize=(10, 5))
         sns.lineplot(data=df, x='prediction_time', y='predicted_value', hue='component_id', marker="o", ax=ax)
@@ -127,14 +130,15 @@ view_choice = st.sidebar.radio(
 )
 
 # === LOAD DATA ===
-if view_choice == "Components Needing Attention":
-    df = load_data("SELECT * FROM components_needing_attention;")
-elif view_choice == "Dashboard Snapshot":
-    df = load_data("SELECT * FROM dashboard_snapshot_view;")
-elif view_choice == "Engine Health Overview":
-    df = load_data("SELECT * FROM engine_health_view;")
-else:
-    df = load_data("SELECT * FROM component_predictions ORDER BY prediction_time DESC LIMIT 100;")
+with st.spinner("Loading..."):
+    if view_choice == "Components Needing Attention":
+        df = load_data("SELECT * FROM components_needing_attention;")
+    elif view_choice == "Dashboard Snapshot":
+        df = load_data("SELECT * FROM dashboard_snapshot_view;")
+    elif view_choice == "Engine Health Overview":
+        df = load_data("SELECT * FROM engine_health_view;")
+    else:
+        df = load_data("SELECT * FROM component_predictions ORDER BY prediction_time DESC LIMIT 100;")
 
 # === DISPLAY DATA ===
 st.markdown(f"""
@@ -165,9 +169,11 @@ else:
         plot_rul_trend(df)
 
     if "confidence" in df.columns and "prediction_type" in df.columns:
-        critical_alerts = df[(df["confidence"] > 0.9) & (df["prediction_type"] == "failure")]
+        critical_alerts = df[(df["confidence"] > CRITICAL_CONFIDENCE) & (df["prediction_type"] == "failure")]
         if not critical_alerts.empty:
-            st.error(f"🚨 {len(critical_alerts)} CRITICAL failure predictions detected!")
+            fleet_count = fleet_kpis(DB_PATH)["critical_failures"]
+            st.error(f"🚨 {len(critical_alerts)} CRITICAL failure predictions in this view "
+                     f"({fleet_count} across the fleet)!")
 
     if "confidence" in df.columns:
         conf_level = st.slider("Minimum Confidence", 0.0, 1.0, 0.7)
@@ -0,0 +1,206 @@
+# recommendations.py
+"""Rule engine linking component_predictions to preventive tasks.
+
+Thresholds live in the ``recommendation_rules`` table. ``generate_recommendations``
+evaluates every rule against all predictions added since the last run (by
+rowid, so same-second batches and backfills are not skipped) in a
+single INSERT ... SELECT, so the fleet is re-scored in one set-based pass.
+
+Rules form tiers within a ``task_group`` (by default the prediction type).
+Only the most specific matching tier fires per component and group: the
+tightest RUL bound, then the highest confidence threshold. A recommendation
+stays open until ``resolve_recommendations`` sets its ``resolved_at``. While
+it is open, that tier or any less specific tier in the group is not issued
+again.
+"""
+import argparse
+import sqlite3
+from datetime import datetime
+
+DB_PATH = "ga_maintenance.db"
+
+# (prediction_type, min_confidence, max_rul_hours, task_id, model_alert)
+# max_rul_hours = None means the rule fires on confidence alone.
+DEFAULT_RULES = [
+    ('failure', 0.90, None, 1, 'Critical Failure Predicted'),
+    ('failure', 0.75, None, 2, 'Elevated Failure Risk'),
+    ('remaining_life', 0.70, 25, 3, 'RUL Below 25h'),
+    ('remaining_life', 0.70, 100, 4, 'RUL Below 100h'),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendation_rules (
+    rule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prediction_type TEXT NOT NULL,
+    min_confidence REAL NOT NULL DEFAULT 0,
+    max_rul_hours REAL,
+    task_id INTEGER NOT NULL,
+    model_alert TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    task_group TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_rules_type_conf
+    ON recommendation_rules (prediction_type, min_confidence) WHERE active = 1;
+
+CREATE TABLE IF NOT EXISTS recommendation_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    last_prediction_time TEXT,
+    inserted INTEGER NOT NULL,
+    last_prediction_rowid INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_predictions_time_type
+    ON component_predictions (prediction_time, prediction_type);
+CREATE INDEX IF NOT EXISTS idx_recommendations_comp_task
+    ON maintenance_recommendations (component_id, task_id, timestamp);
+"""
+
+# NULLs are distinct in a plain UNIQUE constraint, so confidence-only rules
+# (max_rul_hours IS NULL) need the COALESCE to de-duplicate on re-seeding.
+# Earlier databases may already hold such duplicates; keep the first.
+RULES_UNIQUE_SQL = """
+DELETE FROM recommendation_rules
+WHERE rule_id NOT IN (
+    SELECT MIN(rule_id) FROM recommendation_rules
+    GROUP BY prediction_type, min_confidence, COALESCE(max_rul_hours, -1), task_id
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rules_unique
+    ON recommendation_rules (prediction_type, min_confidence, COALESCE(max_rul_hours, -1), task_id);
+UPDATE recommendation_rules SET task_group = prediction_type WHERE task_group IS NULL;
+"""
+
+# Rules ranked within their task group, most specific first
+RANKED_RULES_SQL = """
+ranked_rules AS (
+    SELECT r.*, ROW_NUMBER() OVER (
+               PARTITION BY r.task_group
+               ORDER BY COALESCE(r.max_rul_hours, 1e308), r.min_confidence DESC, r.rule_id
+           ) AS tier
+    FROM recommendation_rules r
+    JOIN preventive_tasks t ON t.task_id = r.task_id
+    WHERE r.active = 1
+)
+"""
+
+# Most specific matching tier per (component, task group) among predictions
+# after the watermark; skipped while an open recommendation of that tier or
+# a more specific one exists for the component.
+EVALUATE_SQL = f"""
+INSERT INTO maintenance_recommendations (component_id, task_id, model_alert, confidence, timestamp)
+WITH {RANKED_RULES_SQL},
+matches AS (
+    SELECT p.component_id, r.task_group, r.tier, r.task_id, r.model_alert,
+           p.confidence, p.prediction_time,
+           ROW_NUMBER() OVER (
+               PARTITION BY p.component_id, r.task_group
+               ORDER BY r.tier, p.confidence DESC, p.prediction_time DESC
+           ) AS pick
+    FROM component_predictions p
+    JOIN ranked_rules r
+      ON r.prediction_type = p.prediction_type
+     AND p.confidence >= r.min_confidence
+     AND (r.max_rul_hours IS NULL OR p.predicted_value <= r.max_rul_hours)
+    WHERE p.rowid > :since AND p.rowid <= :upto
+)
+SELECT m.component_id, m.task_id, m.model_alert, m.confidence, m.prediction_time
+FROM matches m
+WHERE m.pick = 1
+  AND NOT EXISTS (
+    SELECT 1 FROM maintenance_recommendations o
+    JOIN ranked_rules r2 ON r2.task_id = o.task_id AND r2.task_group = m.task_group
+    WHERE o.component_id = m.component_id
+      AND o.resolved_at IS NULL
+      AND r2.tier <= m.tier
+)
+"""
+
+
+def _add_column(conn, table, column, decl):
+    if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def ensure_schema(conn):
+    """Create the rules/run tables and supporting indexes if missing."""
+    conn.executescript(SCHEMA)
+    _add_column(conn, "recommendation_rules", "task_group", "TEXT")
+    _add_column(conn, "maintenance_recommendations", "resolved_at", "TEXT")
+    _add_column(conn, "recommendation_runs", "last_prediction_rowid", "INTEGER")
+    conn.executescript(RULES_UNIQUE_SQL)
+
+
+def seed_rules(conn, rules=DEFAULT_RULES):
+    """Insert rules, ignoring any that already exist; each rule's group is its prediction type."""
+    conn.executemany("""
+        INSERT OR IGNORE INTO recommendation_rules
+            (prediction_type, min_confidence, max_rul_hours, task_id, model_alert, task_group)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?1)
+    """, rules)
+    conn.commit()
+
+
+def resolve_recommendations(conn, component_id, task_id=None, resolved_at=None):
+    """Close open recommendations for a component (optionally one task); return rows closed."""
+    resolved_at = resolved_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with conn:
+        cur = conn.execute("""
+            UPDATE maintenance_recommendations SET resolved_at = ?
+            WHERE component_id = ? AND (? IS NULL OR task_id = ?) AND resolved_at IS NULL
+        """, (resolved_at, component_id, task_id, task_id))
+    return cur.rowcount
+
+
+def generate_recommendations(conn, full=False):
+    """Evaluate all active rules against new predictions; return rows inserted.
+
+    With ``full=True`` the watermark is ignored and the whole prediction
+    history is re-evaluated (open recommendations are still de-duplicated).
+    """
+    since = 0 if full else _rowid_watermark(conn)
+    upto, latest = conn.execute(
+        "SELECT COALESCE(MAX(rowid), 0), MAX(prediction_time) FROM component_predictions"
+    ).fetchone()
+
+    with conn:
+        cur = conn.execute(EVALUATE_SQL, {"since": since, "upto": upto})
+        inserted = cur.rowcount
+        conn.execute("""
+            INSERT INTO recommendation_runs (run_at, last_prediction_time, inserted, last_prediction_rowid)
+            VALUES (?, ?, ?, ?)
+        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), latest, inserted, max(upto, since)))
+    return inserted
+
+
+def _rowid_watermark(conn):
+    """Highest prediction rowid already evaluated.
+
+    Runs recorded before the rowid watermark existed only stored a
+    prediction_time; translate that to the last rowid at or before it.
+    """
+    rowid, last_time = conn.execute("""
+        SELECT MAX(last_prediction_rowid), MAX(last_prediction_time) FROM recommendation_runs
+    """).fetchone()
+    if rowid is not None:
+        return rowid
+    if last_time is None:
+        return 0
+    return conn.execute(
+        "SELECT COALESCE(MAX(rowid), 0) FROM component_predictions WHERE prediction_time <= ?",
+        (last_time,)
+    ).fetchone()[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate maintenance recommendations from predictions.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--seed-rules", action="store_true", help="Insert DEFAULT_RULES first")
+    parser.add_argument("--full", action="store_true", help="Re-evaluate all predictions")
+    args = parser.parse_args()
+
+    with sqlite3.connect(args.db) as conn:
+        ensure_schema(conn)
+        if args.seed_rules:
+            seed_rules(conn)
+        count = generate_recommendations(conn, full=args.full)
+    print(f"✅ Inserted {count} maintenance recommendations.")
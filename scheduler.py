@@ -0,0 +1,308 @@
+# scheduler.py
+"""Heap-backed index of due preventive tasks across the fleet.
+
+Keeps one entry per ``due_preventive_tasks`` row in a fleet-wide heap and
+in a per-tail heap, ordered by due time. A task's due time is the timestamp
+of the row that made it due; the schema has no task intervals to project a
+later next-due time from, so anything already due counts as overdue. Entries are only recomputed for tails
+that were touched (new recommendation, sensor data or a completion), so the
+due-tasks page no longer re-evaluates the ``due_preventive_tasks`` view for
+the whole fleet on every view. New rows are found by rowid; updates and
+deletes of recommendations (e.g. ``resolve_recommendations``) are recorded by
+triggers in ``recommendation_changes``, created by the setup step:
+
+    python scheduler.py --db ga_maintenance.db
+
+Without that table every sync reloads the whole fleet.
+"""
+import argparse
+import heapq
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from compact_storage import is_compact
+
+DB_PATH = "ga_maintenance.db"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendation_changes (
+    change_id INTEGER PRIMARY KEY,
+    component_id INTEGER
+);
+CREATE TRIGGER IF NOT EXISTS recommendation_changes_update AFTER UPDATE ON maintenance_recommendations
+BEGIN
+    INSERT INTO recommendation_changes (component_id) VALUES (OLD.component_id);
+    INSERT INTO recommendation_changes (component_id)
+    SELECT NEW.component_id WHERE NEW.component_id IS NOT OLD.component_id;
+END;
+CREATE TRIGGER IF NOT EXISTS recommendation_changes_delete AFTER DELETE ON maintenance_recommendations
+BEGIN
+    INSERT INTO recommendation_changes (component_id) VALUES (OLD.component_id);
+END;
+"""
+
+
+def ensure_schema(conn):
+    """Create the change log that lets sync() see recommendation updates and deletes."""
+    conn.executescript(SCHEMA)
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value)[:19], TIME_FORMAT)
+    except (TypeError, ValueError):
+        return datetime.max
+
+
+def _iter_sorted(heap):
+    """Yield heap items in ascending order without popping (O(k log k) for k items)."""
+    if not heap:
+        return
+    frontier = [(heap[0], 0)]
+    while frontier:
+        item, i = heapq.heappop(frontier)
+        yield item
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+
+def _row_ident(row, n):
+    """Identity of a due-task row within its (tail, task): the component, else load order."""
+    component_id = row.get("component_id")
+    return n if component_id is None else component_id
+
+
+class TaskScheduler:
+    """Priority queue of (tail_number, task_id, component) -> due time.
+
+    Superseded heap entries are invalidated lazily via a per-key version
+    counter and compacted once they outnumber the live ones.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries = {}      # (tail, task_id, ident) -> (due_at, version, row)
+        self._fleet = []        # heap of (due_at, version, key)
+        self._by_tail = {}      # tail -> heap of (due_at, version, key)
+        self._tail_tasks = {}   # tail -> set of keys with a live entry
+        self._version = 0
+        self._dirty = set()
+        self._watermarks = {"maintenance_recommendations": 0, "sensor_data": 0,
+                            "recommendation_changes": 0}
+        self._loaded = False
+
+    # === UPDATES ===
+    def _put(self, key, due_at, row):
+        self._version += 1
+        self._entries[key] = (due_at, self._version, row)
+        heapq.heappush(self._fleet, (due_at, self._version, key))
+        heapq.heappush(self._by_tail.setdefault(key[0], []), (due_at, self._version, key))
+        self._tail_tasks.setdefault(key[0], set()).add(key)
+
+    def _drop_tail(self, tail):
+        for key in self._tail_tasks.pop(tail, ()):
+            self._entries.pop(key, None)
+        self._by_tail.pop(tail, None)
+
+    def _compact(self):
+        if len(self._fleet) > 2 * len(self._entries) + 64:
+            self._fleet = [e for e in self._fleet if self._is_live(e[2], e[1])]
+            heapq.heapify(self._fleet)
+
+    def _is_live(self, key, version):
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] == version
+
+    def set_due(self, tail, task_id, due_at, component_id=None, row=None):
+        """Insert or move a single task's due time."""
+        row = dict(row or {}, tail_number=tail, task_id=task_id)
+        if component_id is not None:
+            row["component_id"] = component_id
+        with self._lock:
+            self._put((tail, task_id, _row_ident(row, 0)), _parse_time(due_at), row)
+            self._compact()
+
+    def complete(self, tail, task_id, component_id=None):
+        """Remove a task once it has been signed off (for one component, or all on the tail)."""
+        with self._lock:
+            keys = self._tail_tasks.get(tail, set())
+            for key in [k for k in keys if k[1] == task_id
+                        and (component_id is None or k[2] == component_id)]:
+                self._entries.pop(key, None)
+                keys.discard(key)
+            self._compact()
+
+    def touch(self, tail):
+        """Mark a tail as changed; it is reloaded on the next query."""
+        with self._lock:
+            self._dirty.add(tail)
+
+    # === DATABASE SYNC ===
+    @staticmethod
+    def _due_query(conn):
+        """The due-task rows, minus ones whose recommendations have all been resolved."""
+        view_cols = {row[1] for row in conn.execute("PRAGMA table_info(due_preventive_tasks)")}
+        rec_cols = {row[1] for row in conn.execute("PRAGMA table_info(maintenance_recommendations)")}
+        if "resolved_at" not in rec_cols or not {"component_id", "task_id"} <= view_cols:
+            return "SELECT * FROM due_preventive_tasks d WHERE 1"
+        return """
+            SELECT * FROM due_preventive_tasks d
+            WHERE NOT (
+                EXISTS (SELECT 1 FROM maintenance_recommendations m
+                        WHERE m.component_id = d.component_id AND m.task_id = d.task_id
+                          AND m.resolved_at IS NOT NULL)
+                AND NOT EXISTS (SELECT 1 FROM maintenance_recommendations m
+                                WHERE m.component_id = d.component_id AND m.task_id = d.task_id
+                                  AND m.resolved_at IS NULL)
+            )
+        """
+
+    def _load_tails(self, conn, tails=None):
+        conn.row_factory = sqlite3.Row
+        query = self._due_query(conn)
+        if tails is None:
+            rows = conn.execute(query).fetchall()
+            self._entries.clear()
+            self._fleet.clear()
+            self._by_tail.clear()
+            self._tail_tasks.clear()
+        else:
+            tails = list(tails)
+            for tail in tails:
+                self._drop_tail(tail)
+            placeholders = ",".join("?" * len(tails))
+            rows = conn.execute(f"{query} AND d.tail_number IN ({placeholders})", tails).fetchall()
+        # Several rows can share (tail, task); keep each one, and for repeats of
+        # the same component keep the most urgent
+        loaded, seen = {}, {}
+        for row in rows:
+            row = dict(row)
+            group = (row["tail_number"], row["task_id"])
+            n = seen[group] = seen.get(group, -1) + 1
+            key = group + (_row_ident(row, n),)
+            due_at = _parse_time(row["timestamp"])
+            if key not in loaded or due_at < loaded[key][0]:
+                loaded[key] = (due_at, row)
+        for key, (due_at, row) in loaded.items():
+            self._put(key, due_at, row)
+        self._compact()
+
+    @staticmethod
+    def _sensor_source(conn):
+        """(table, tail join, tail column) for sensor rows; sensor_data may be a compact view."""
+        if is_compact(conn):
+            return "sensor_data_compact s", "JOIN tails t ON t.tail_id = s.tail_id", "t.tail_number"
+        return "sensor_data s", "", "s.tail_number"
+
+    @staticmethod
+    def _has_change_log(conn):
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recommendation_changes'"
+        ).fetchone() is not None
+
+    def _changed_tails(self, conn):
+        """Tails with recommendations or sensor rows added, updated or deleted since the last sync."""
+        tails = set()
+        for (tail,) in conn.execute("""
+            SELECT DISTINCT c.tail_number FROM recommendation_changes r
+            JOIN components c ON c.component_id = r.component_id
+            WHERE r.change_id > ?
+        """, (self._watermarks["recommendation_changes"],)):
+            tails.add(tail)
+        rec_max = self._watermarks["maintenance_recommendations"]
+        for (tail,) in conn.execute("""
+            SELECT DISTINCT c.tail_number FROM maintenance_recommendations m
+            JOIN components c ON c.component_id = m.component_id
+            WHERE m.rowid > ?
+        """, (rec_max,)):
+            tails.add(tail)
+        table, join, tail_col = self._sensor_source(conn)
+        sensor_max = self._watermarks["sensor_data"]
+        for (tail,) in conn.execute(
+            f"SELECT DISTINCT {tail_col} FROM {table} {join} WHERE s.rowid > ?", (sensor_max,)
+        ):
+            tails.add(tail)
+        return tails
+
+    def _update_watermarks(self, conn):
+        if self._has_change_log(conn):
+            self._watermarks["recommendation_changes"] = conn.execute(
+                "SELECT COALESCE(MAX(change_id), 0) FROM recommendation_changes"
+            ).fetchone()[0]
+        self._watermarks["maintenance_recommendations"] = conn.execute(
+            "SELECT COALESCE(MAX(rowid), 0) FROM maintenance_recommendations"
+        ).fetchone()[0]
+        table, _, _ = self._sensor_source(conn)
+        self._watermarks["sensor_data"] = conn.execute(
+            f"SELECT COALESCE(MAX(s.rowid), 0) FROM {table}"
+        ).fetchone()[0]
+
+    def sync(self):
+        """Bring the index up to date, reloading only tails that changed."""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            if not self._loaded or not self._has_change_log(conn):
+                self._update_watermarks(conn)
+                self._load_tails(conn)
+                self._loaded = True
+                self._dirty.clear()
+                return
+            tails = self._changed_tails(conn) | self._dirty
+            self._update_watermarks(conn)
+            if tails:
+                self._load_tails(conn, tails)
+            self._dirty.clear()
+
+    # === QUERIES ===
+    def top(self, n=10):
+        """The n most urgent tasks across the fleet, earliest due first."""
+        out = []
+        with self._lock:
+            for due_at, version, key in _iter_sorted(self._fleet):
+                if self._is_live(key, version):
+                    out.append(self._entries[key][2])
+                    if len(out) >= n:
+                        break
+        return out
+
+    def for_tail(self, tail):
+        """Every task for one tail, earliest due first."""
+        with self._lock:
+            return [self._entries[key][2]
+                    for due_at, version, key in _iter_sorted(self._by_tail.get(tail, []))
+                    if self._is_live(key, version)]
+
+    def due_within(self, tail, hours, now=None):
+        """Tasks for one tail due within ``hours`` from now, overdue ones included."""
+        horizon = (now or datetime.now()) + timedelta(hours=hours)
+        out = []
+        with self._lock:
+            for due_at, version, key in _iter_sorted(self._by_tail.get(tail, [])):
+                if due_at > horizon:
+                    break
+                if self._is_live(key, version):
+                    out.append(self._entries[key][2])
+        return out
+
+    def tails(self):
+        with self._lock:
+            return sorted(tail for tail, tasks in self._tail_tasks.items() if tasks)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the recommendation change log used by the scheduler.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    # mode=rw: fail on a missing database instead of creating an empty one
+    with sqlite3.connect(f"file:{args.db}?mode=rw", uri=True) as conn:
+        ensure_schema(conn)
+    print(f"✅ Recommendation change log ready in {args.db}.")
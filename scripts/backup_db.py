@@ -0,0 +1,277 @@
+# backup_db.py
+"""Online SQLite backups and incremental page snapshots.
+
+``copy`` uses ``sqlite3.Connection.backup`` in small page batches with a pause
+between batches, so the generator, scoring job and dashboards keep running
+while the backup is taken. A write from another connection restarts a
+batched copy; if that keeps happening the copy finishes in a single step.
+
+``snapshot`` builds on that consistent copy and stores only the pages that
+changed since the previous snapshot, gzip-compressed. A snapshot chain is one
+full snapshot followed by incrementals; ``restore`` replays a chain and
+``rotate`` deletes whole chains, never a base that newer snapshots depend on.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DB_PATH = "database/ga_maintenance.db"
+BACKUP_DIR = "backups"
+
+PAGES_PER_STEP = 1024
+STEP_SLEEP = 0.01
+MAX_RESTARTS = 3
+DIGEST_SIZE = 16
+RECORD_HEADER = struct.Struct(">I")  # page number, followed by page_size bytes
+
+
+# === ONLINE COPY ===
+class _BackupRestarting(Exception):
+    pass
+
+
+def online_backup(db_path, dest_path, pages=PAGES_PER_STEP, sleep=STEP_SLEEP,
+                  max_restarts=MAX_RESTARTS):
+    """Copy a live database to ``dest_path`` in throttled page batches.
+
+    Any write from another connection sends a batched backup back to page one,
+    so a steady writer (e.g. the ingest service) could keep a large copy from
+    ever finishing. After ``max_restarts`` restarts the copy is redone in one
+    step, which holds a read transaction for its duration and cannot restart.
+    """
+    progress = {"remaining": None, "restarts": 0}
+
+    def throttle(status, remaining, total):
+        if progress["remaining"] is not None and remaining > progress["remaining"]:
+            progress["restarts"] += 1
+            if progress["restarts"] > max_restarts:
+                raise _BackupRestarting
+        progress["remaining"] = remaining
+        if sleep:
+            time.sleep(sleep)
+
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest_path)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=throttle)
+        except _BackupRestarting:
+            print(f"⚠️ Backup restarted {progress['restarts']} times under concurrent writes; "
+                  "finishing in a single step.", file=sys.stderr)
+            src.backup(dst, pages=-1)
+    finally:
+        dst.close()
+        src.close()
+    return dest_path
+
+
+# === SNAPSHOT STORE ===
+def _snapshot_paths(backup_dir, snap_id):
+    base = os.path.join(backup_dir, f"snap_{snap_id}")
+    return base + ".json", base + ".hashes", base + ".pack.gz"
+
+
+def list_snapshots(backup_dir):
+    """Snapshot manifests in the directory, oldest first."""
+    manifests = []
+    if not os.path.isdir(backup_dir):
+        return manifests
+    for name in sorted(os.listdir(backup_dir)):
+        if name.startswith("snap_") and name.endswith(".json"):
+            with open(os.path.join(backup_dir, name)) as f:
+                manifests.append(json.load(f))
+    return sorted(manifests, key=lambda m: m["id"])
+
+
+def _chain(backup_dir, snap_id):
+    """Manifests from the full base up to ``snap_id``."""
+    by_id = {m["id"]: m for m in list_snapshots(backup_dir)}
+    if snap_id not in by_id:
+        raise FileNotFoundError(f"Snapshot {snap_id} not found in {backup_dir}")
+    chain = [by_id[snap_id]]
+    while chain[-1]["parent"] is not None:
+        parent = chain[-1]["parent"]
+        if parent not in by_id:
+            raise FileNotFoundError(f"Snapshot chain broken: parent {parent} of {chain[-1]['id']} missing")
+        chain.append(by_id[parent])
+    return list(reversed(chain))
+
+
+def _read_hashes(backup_dir, snap_id):
+    with open(_snapshot_paths(backup_dir, snap_id)[1], "rb") as f:
+        data = f.read()
+    return [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def snapshot(db_path, backup_dir=BACKUP_DIR, full_every=7, force_full=False, **copy_kwargs):
+    """Take a snapshot, storing only pages that differ from the previous one.
+
+    Only the stored output is incremental: each snapshot still makes a full
+    online copy of the database and hashes every page to find the changes.
+    A new full snapshot is started when there is none yet, when the page size
+    changed, or once the current chain holds ``full_every`` incrementals.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    snap_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    existing = list_snapshots(backup_dir)
+    parent = existing[-1] if existing and not force_full else None
+
+    with tempfile.TemporaryDirectory(dir=backup_dir) as tmp:
+        copy_path = online_backup(db_path, os.path.join(tmp, "copy.db"), **copy_kwargs)
+        conn = sqlite3.connect(copy_path)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.close()
+
+        if parent is not None:
+            chain_len = len(_chain(backup_dir, parent["id"]))
+            if parent["page_size"] != page_size or chain_len > full_every:
+                parent = None
+        parent_hashes = _read_hashes(backup_dir, parent["id"]) if parent else []
+
+        manifest_path, hashes_path, pack_path = _snapshot_paths(backup_dir, snap_id)
+        page_count = changed = 0
+        with open(copy_path, "rb") as src, open(hashes_path + ".tmp", "wb") as hashes, \
+                gzip.open(pack_path + ".tmp", "wb", compresslevel=6) as pack:
+            while True:
+                page = src.read(page_size)
+                if not page:
+                    break
+                digest = hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+                hashes.write(digest)
+                if page_count >= len(parent_hashes) or parent_hashes[page_count] != digest:
+                    pack.write(RECORD_HEADER.pack(page_count))
+                    pack.write(page)
+                    changed += 1
+                page_count += 1
+
+    os.replace(hashes_path + ".tmp", hashes_path)
+    os.replace(pack_path + ".tmp", pack_path)
+    manifest = {
+        "id": snap_id,
+        "parent": parent["id"] if parent else None,
+        "page_size": page_size,
+        "page_count": page_count,
+        "changed_pages": changed,
+        "source": os.path.abspath(db_path),
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    # The manifest is written last so a half-written snapshot is never listed
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def restore(backup_dir, snap_id, out_path):
+    """Rebuild the database as of ``snap_id`` by replaying its chain."""
+    chain = _chain(backup_dir, snap_id)
+    target = chain[-1]
+    page_size = target["page_size"]
+    tmp_path = out_path + ".restoring"
+    with open(tmp_path, "wb") as out:
+        for manifest in chain:
+            with gzip.open(_snapshot_paths(backup_dir, manifest["id"])[2], "rb") as pack:
+                while True:
+                    header = pack.read(RECORD_HEADER.size)
+                    if not header:
+                        break
+                    (page_no,) = RECORD_HEADER.unpack(header)
+                    out.seek(page_no * page_size)
+                    out.write(pack.read(page_size))
+        out.truncate(target["page_count"] * page_size)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        os.remove(tmp_path)
+        raise RuntimeError(f"Restored database failed integrity check: {result}")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def rotate(backup_dir=BACKUP_DIR, keep_chains=4):
+    """Delete all but the newest ``keep_chains`` snapshot chains."""
+    snapshots = list_snapshots(backup_dir)
+    bases = [m["id"] for m in snapshots if m["parent"] is None]
+    keep_from = bases[-keep_chains] if len(bases) > keep_chains else None
+    removed = []
+    if keep_from is None:
+        return removed
+    for manifest in snapshots:
+        if manifest["id"] >= keep_from:
+            break
+        # Manifest first, so an interrupted rotation never leaves a listed
+        # snapshot without its data files
+        for path in _snapshot_paths(backup_dir, manifest["id"]):
+            if os.path.exists(path):
+                os.remove(path)
+        removed.append(manifest["id"])
+    return removed
+
+
+# === CLI ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Online backups for the GA maintenance database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_copy = sub.add_parser("copy", help="Plain online backup to a single .db file")
+    p_copy.add_argument("--db", default=DB_PATH)
+    p_copy.add_argument("--dest", default=BACKUP_DIR)
+
+    p_snap = sub.add_parser("snapshot", help="Incremental compressed snapshot")
+    p_snap.add_argument("--db", default=DB_PATH)
+    p_snap.add_argument("--dest", default=BACKUP_DIR)
+    p_snap.add_argument("--full", action="store_true", help="Start a new chain")
+    p_snap.add_argument("--full-every", type=int, default=7)
+
+    p_restore = sub.add_parser("restore", help="Rebuild a database from a snapshot")
+    p_restore.add_argument("--dest", default=BACKUP_DIR)
+    p_restore.add_argument("--snapshot", help="Snapshot id (default: latest)")
+    p_restore.add_argument("--out", required=True)
+
+    p_rotate = sub.add_parser("rotate", help="Delete old snapshot chains")
+    p_rotate.add_argument("--dest", default=BACKUP_DIR)
+    p_rotate.add_argument("--keep-chains", type=int, default=4)
+
+    for p in (p_copy, p_snap):
+        p.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="Pages copied per step")
+        p.add_argument("--sleep", type=float, default=STEP_SLEEP, help="Pause between steps (s)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "copy":
+        os.makedirs(args.dest, exist_ok=True)
+        name = f"ga_maintenance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        path = online_backup(args.db, os.path.join(args.dest, name), pages=args.pages, sleep=args.sleep)
+        print(f"Success: Created {path}")
+    elif args.command == "snapshot":
+        m = snapshot(args.db, args.dest, full_every=args.full_every, force_full=args.full,
+                     pages=args.pages, sleep=args.sleep)
+        kind = "full" if m["parent"] is None else f"incremental (parent {m['parent']})"
+        print(f"Success: Snapshot {m['id']} {kind}, {m['changed_pages']}/{m['page_count']} pages stored")
+    elif args.command == "restore":
+        snaps = list_snapshots(args.dest)
+        if not snaps:
+            print(f"Error: No snapshots in {args.dest}", file=sys.stderr)
+            return 1
+        snap_id = args.snapshot or snaps[-1]["id"]
+        restore(args.dest, snap_id, args.out)
+        print(f"Success: Restored {snap_id} to {args.out}")
+    elif args.command == "rotate":
+        for snap_id in rotate(args.dest, args.keep_chains):
+            print(f"Removed snapshot {snap_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,18 +4,21 @@
 BACKUP_DIR="../database/backups"
 LOG_FILE="../logs/rotation.log"
 DAYS_TO_KEEP=7
+CHAINS_TO_KEEP=4
 
 # Create directories if they don't exist
 mkdir -p "$BACKUP_DIR"
 mkdir -p "$(dirname "$LOG_FILE")"
 
 # Verify there are backups to rotate
-if [ -z "$(ls -A "$BACKUP_DIR"/*.db 2>/dev/null)" ]; then
+if [ -z "$(ls -A "$BACKUP_DIR"/*.db "$BACKUP_DIR"/snap_*.json 2>/dev/null)" ]; then
     echo "$(date) - No backups found in $BACKUP_DIR" >> "$LOG_FILE"
     exit 0
 fi
 
 # Rotate backups
 echo "=== Rotation started at $(date) ===" >> "$LOG_FILE"
-find "$BACKUP_DIR" -name "*.db" -mtime +$DAYS_TO_KEEP -print -delete >> "$LOG_FILE" 2>&1
+find "$BACKUP_DIR" -maxdepth 1 -name "*.db" -mtime +$DAYS_TO_KEEP -print -delete >> "$LOG_FILE" 2>&1
+# Snapshots depend on their chain, so they are rotated by chain, not mtime
+python3 "$(dirname "$0")/backup_db.py" rotate --dest "$BACKUP_DIR" --keep-chains $CHAINS_TO_KEEP >> "$LOG_FILE" 2>&1
 echo "=== Rotation completed ===" >> "$LOG_FILE"
@@ -0,0 +1,308 @@
+# sweep.py
+"""Parallel hyperparameter sweep for the RUL models.
+
+The windowed training data is prepared once and written to ``.npy`` files
+that every worker opens with ``mmap_mode='r'``, so a 50-config sweep shares
+one copy of the data through the page cache instead of pickling it to each
+process. Each finished config is logged as a ``predictive_models`` row.
+"""
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from utils import load_sensor_data
+
+DB_PATH = "ga_maintenance.db"
+TOP_PARAMS = ['cht', 'fuel_flow', 'rpm', 'manifold_press',
+              'bus_voltage', 'alternator_current', 'hyd_press',
+              'brake_press', 'oil_press', 'oil_temp']
+
+SWEEP_MODEL_TYPE = "sweep"
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "NUMEXPR_NUM_THREADS", "TF_NUM_INTRAOP_THREADS")
+
+# Per-process cache of the memory-mapped dataset, keyed by directory
+_DATASET = {}
+
+
+# === DATA PREPARATION (runs once, in the parent) ===
+def prepare_dataset(db_path, out_dir):
+    """Pivot and scale sensor_data and write it as memory-mappable arrays.
+
+    Rows are sorted by (component_id, timestamp); ``starts`` holds the first
+    row of each component so workers can cut windows of any length.
+    """
+    sensor_data = load_sensor_data(TOP_PARAMS, db_path)
+    with sqlite3.connect(db_path) as conn:
+        components = pd.read_sql_query(
+            "SELECT component_id, remaining_useful_life FROM components", conn
+        )
+
+    sensor_data = sensor_data.dropna(subset=['timestamp'])
+
+    pivoted = sensor_data.pivot_table(index=['component_id', 'timestamp'], columns='parameter',
+                                      values='value', observed=True).sort_index()
+    pivoted.columns = pivoted.columns.astype(str)
+    pivoted = pivoted.reindex(columns=TOP_PARAMS).reset_index()
+    pivoted[TOP_PARAMS] = pivoted.groupby('component_id')[TOP_PARAMS].transform(
+        lambda col: col.ffill().bfill()
+    )
+    pivoted = pivoted.dropna(subset=TOP_PARAMS)
+
+    rul = components.dropna(subset=['remaining_useful_life']).set_index('component_id')['remaining_useful_life']
+    pivoted = pivoted[pivoted['component_id'].isin(rul.index)]
+
+    y_max = rul.max() if not rul.empty else 1
+    if pd.isna(y_max) or y_max == 0:
+        y_max = 1
+
+    # MinMax scaling without pulling in sklearn here
+    values = pivoted[TOP_PARAMS].to_numpy(dtype=np.float32)
+    lo, hi = values.min(axis=0), values.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1)
+    features = (values - lo) / span
+
+    comp_ids, counts = np.unique(pivoted['component_id'].to_numpy(), return_counts=True)
+    starts = np.concatenate([[0], np.cumsum(counts)])
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "features.npy"), features.astype(np.float32))
+    np.save(os.path.join(out_dir, "starts.npy"), starts.astype(np.int64))
+    np.save(os.path.join(out_dir, "comp_ids.npy"), comp_ids.astype(np.int64))
+    np.save(os.path.join(out_dir, "rul.npy"), (rul.loc[comp_ids].to_numpy() / y_max).astype(np.float32))
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"y_max": float(y_max), "params": TOP_PARAMS, "rows": int(len(features))}, f)
+    return out_dir
+
+
+def _load_dataset(data_dir):
+    """Open the prepared arrays read-only; cached for the life of the worker."""
+    if data_dir not in _DATASET:
+        with open(os.path.join(data_dir, "meta.json")) as f:
+            meta = json.load(f)
+        _DATASET[data_dir] = {
+            "features": np.load(os.path.join(data_dir, "features.npy"), mmap_mode='r'),
+            "starts": np.load(os.path.join(data_dir, "starts.npy")),
+            "comp_ids": np.load(os.path.join(data_dir, "comp_ids.npy")),
+            "rul": np.load(os.path.join(data_dir, "rul.npy")),
+            "y_max": meta["y_max"],
+        }
+    return _DATASET[data_dir]
+
+
+def window_index(starts, seq_len):
+    """Return (first row, component position) for every full window of ``seq_len`` rows."""
+    lengths = np.maximum(np.diff(starts) - seq_len + 1, 0)
+    comp_pos = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return starts[:-1][comp_pos] + offsets, comp_pos
+
+
+# === WORKER ===
+def _init_worker(threads):
+    """Cap thread pools of libraries the worker loads later (TF, OpenMP)."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+
+def run_config(data_dir, config, threads=1, test_size=0.2, seed=42):
+    """Fit and score one configuration against the shared dataset."""
+    ds = _load_dataset(data_dir)
+    seq_len = config["seq_len"]
+    win_start, comp_pos = window_index(ds["starts"], seq_len)
+    if len(win_start) < 2:
+        raise ValueError(f"Not enough rows for seq_len={seq_len}")
+
+    y = ds["rul"][comp_pos]
+    train_idx, test_idx = component_split(comp_pos, test_size, seed)
+
+    # Env vars only reach libraries loaded after they are set; numpy's BLAS is
+    # already up in a forked worker, so cap the loaded pools directly as well
+    with threadpool_limits(limits=threads):
+        return _fit_and_score(ds, config, win_start, y, train_idx, test_idx, threads, seed)
+
+
+def component_split(comp_pos, test_size=0.2, seed=42):
+    """Split window indices so each component's windows land wholly in train or test.
+
+    Every window of a component shares its RUL target, so a window-level split
+    would score the model on components it has already seen.
+    """
+    comps = np.unique(comp_pos)
+    if len(comps) < 2:
+        raise ValueError("Need at least two components to hold one out")
+    comps = np.random.default_rng(seed).permutation(comps)
+    n_test = min(max(int(round(len(comps) * test_size)), 1), len(comps) - 1)
+    is_test = np.isin(comp_pos, comps[:n_test])
+    return np.flatnonzero(~is_test), np.flatnonzero(is_test)
+
+
+def _window_batches(features, win_start, seq_len, idx, y=None, batch_size=16, shuffle=False, seed=42):
+    """Yield LSTM batches cut from the memory-mapped features, one batch at a time."""
+    from tensorflow.keras.utils import Sequence
+
+    class WindowBatches(Sequence):
+        def __init__(self):
+            super().__init__()
+            self.idx = np.array(idx)
+            self.rng = np.random.default_rng(seed)
+            self.on_epoch_end()
+
+        def __len__(self):
+            return int(np.ceil(len(self.idx) / batch_size))
+
+        def __getitem__(self, i):
+            batch = self.idx[i * batch_size:(i + 1) * batch_size]
+            rows = win_start[batch][:, None] + np.arange(seq_len)
+            x = np.asarray(features[rows], dtype=np.float32)
+            return x if y is None else (x, y[batch])
+
+        def on_epoch_end(self):
+            if shuffle:
+                self.rng.shuffle(self.idx)
+
+    return WindowBatches()
+
+
+def _fit_and_score(ds, config, win_start, y, train_idx, test_idx, threads, seed):
+    seq_len = config["seq_len"]
+    started = time.perf_counter()
+    if config["kind"] == "rf":
+        from sklearn.ensemble import RandomForestRegressor
+
+        # RF only sees the last timestep of each window
+        x = ds["features"][win_start + seq_len - 1]
+        model = RandomForestRegressor(
+            n_estimators=config["n_estimators"], max_depth=config.get("max_depth"),
+            random_state=seed, n_jobs=threads,
+        )
+        model.fit(x[train_idx], y[train_idx])
+        fit_seconds = time.perf_counter() - started
+        y_pred = model.predict(x[test_idx])
+    elif config["kind"] == "lstm":
+        import tensorflow as tf
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Input, LSTM, Dense
+        from tensorflow.keras.optimizers import Adam
+
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        # Batches are cut from the shared memmap as needed instead of
+        # materialising every window (seq_len copies of the data) per worker
+        features = ds["features"]
+        model = Sequential([
+            Input(shape=(seq_len, features.shape[1])),
+            LSTM(config["units"]),
+            Dense(1)
+        ])
+        model.compile(optimizer=Adam(0.001), loss='mse')
+        model.fit(_window_batches(features, win_start, seq_len, train_idx, y, shuffle=True, seed=seed),
+                  epochs=config.get("epochs", 20), verbose=0)
+        fit_seconds = time.perf_counter() - started
+        y_pred = model.predict(_window_batches(features, win_start, seq_len, test_idx, batch_size=256),
+                               verbose=0).flatten()
+    else:
+        raise ValueError(f"Unknown model kind: {config['kind']}")
+    predict_seconds = time.perf_counter() - started - fit_seconds
+
+    y_true = y[test_idx] * ds["y_max"]
+    y_pred = y_pred * ds["y_max"]
+    err = y_true - y_pred
+    ss_tot = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        "config": config,
+        "mae": float(np.abs(err).mean()),
+        "rmse": float(np.sqrt((err ** 2).mean())),
+        # Undefined when the held-out targets are all equal; stored as null, not a score
+        "r2": float(1 - (err ** 2).sum() / ss_tot) if ss_tot > 0 else None,
+        "fit_seconds": round(fit_seconds, 3),
+        "predict_seconds": round(predict_seconds, 3),
+        "train_windows": int(len(train_idx)),
+        "threads": threads,
+    }
+
+
+# === SWEEP ===
+def build_grid(seq_lens=(10, 30), n_estimators=(50, 100, 200), max_depths=(None, 10, 20),
+               lstm_units=()):
+    """Expand the hyperparameter lists into a list of config dicts."""
+    grid = [
+        {"kind": "rf", "seq_len": s, "n_estimators": n, "max_depth": d}
+        for s, n, d in itertools.product(seq_lens, n_estimators, max_depths)
+    ]
+    grid += [{"kind": "lstm", "seq_len": s, "units": u} for s, u in itertools.product(seq_lens, lstm_units)]
+    return grid
+
+
+def config_name(config):
+    if config["kind"] == "rf":
+        return f"rf_seq{config['seq_len']}_n{config['n_estimators']}_d{config.get('max_depth') or 'none'}"
+    return f"lstm_seq{config['seq_len']}_u{config['units']}"
+
+
+def log_result(conn, result, sweep_id):
+    """Store one sweep result as a predictive_models row."""
+    metrics = {k: v for k, v in result.items() if k != "config"}
+    metrics["params"] = result["config"]
+    metrics["sweep_id"] = sweep_id
+    conn.execute("""
+        INSERT INTO predictive_models (model_name, model_type, version, created_at, performance_metrics)
+        VALUES (?, ?, ?, ?, ?)
+    """, (config_name(result["config"]), SWEEP_MODEL_TYPE, sweep_id,
+          datetime.now().strftime("%Y-%m-%d %H:%M:%S"), json.dumps(metrics)))
+    conn.commit()
+
+
+def run_sweep(db_path, configs, threads_per_job=1, max_workers=None, data_dir=None):
+    """Run every config on a process pool and log results as they finish."""
+    if max_workers is None:
+        max_workers = max((os.cpu_count() or 1) // threads_per_job, 1)
+    sweep_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="pdm_sweep_") as tmp:
+        data_dir = prepare_dataset(db_path, data_dir or tmp)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(threads_per_job,)) as pool, \
+                sqlite3.connect(db_path) as conn:
+            futures = {pool.submit(run_config, data_dir, cfg, threads_per_job): cfg for cfg in configs}
+            for fut in as_completed(futures):
+                cfg = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    print(f"❌ {config_name(cfg)} failed: {e}")
+                    continue
+                log_result(conn, result, sweep_id)
+                results.append(result)
+                print(f"✅ {config_name(cfg)}: RMSE={result['rmse']:.2f} ({result['fit_seconds']:.1f}s)")
+
+    return sorted(results, key=lambda r: r["rmse"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a parallel RUL model sweep.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--seq-lens", type=int, nargs="+", default=[10, 30])
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--max-depths", type=int, nargs="+", default=[0, 10, 20],
+                        help="0 means unlimited depth")
+    parser.add_argument("--lstm-units", type=int, nargs="*", default=[])
+    parser.add_argument("--threads-per-job", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    grid = build_grid(args.seq_lens, args.n_estimators,
+                      [d or None for d in args.max_depths], args.lstm_units)
+    print(f"Running {len(grid)} configs...")
+    run_sweep(args.db, grid, threads_per_job=args.threads_per_job, max_workers=args.workers)
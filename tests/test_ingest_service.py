@@ -0,0 +1,185 @@
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compact_storage  # noqa: E402
+from ingest_service import IngestService, LocalClient  # noqa: E402
+
+SENSOR_TABLE = """
+CREATE TABLE sensor_data (
+    tail_number TEXT, component_id INTEGER, parameter TEXT,
+    value REAL, unit TEXT, timestamp TEXT, sensor_health INTEGER
+)
+"""
+
+
+def reading(**overrides):
+    r = {"tail_number": "N123AB", "component_id": 1, "parameter": "cht",
+         "value": 180.5, "timestamp": "2025-07-01 12:00:00"}
+    r.update(overrides)
+    return r
+
+
+def make_db(tmp_path, with_table=True, table_sql=SENSOR_TABLE):
+    path = str(tmp_path / "ingest.db")
+    with sqlite3.connect(path) as conn:
+        if with_table:
+            conn.execute(table_sql)
+    return path
+
+
+def stored_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sensor_data").fetchone()[0]
+
+
+async def wait_until(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def run_service(db_path, scenario, **kwargs):
+    async def main():
+        service = IngestService(db_path, **kwargs)
+        await service.start()
+        try:
+            await scenario(service, LocalClient(service))
+        finally:
+            await service.stop()
+    asyncio.run(main())
+
+
+def test_accepts_valid_and_rejects_invalid_readings(tmp_path):
+    db = make_db(tmp_path)
+
+    async def scenario(service, client):
+        status, body = await client.send([
+            reading(),
+            reading(parameter="egt"),
+            reading(unit="psi"),
+            reading(value="hot"),
+            reading(timestamp="yesterday"),
+        ])
+        assert status == 200
+        assert body["accepted"] == 1
+        assert body["rejected"] == 4
+        assert [e["index"] for e in body["errors"]] == [1, 2, 3, 4]
+
+    run_service(db, scenario, flush_interval=0.05)
+    assert stored_rows(db) == 1
+
+
+def test_full_queue_returns_503(tmp_path):
+    db = make_db(tmp_path)
+
+    async def scenario(service, client):
+        status, _ = await client.send([reading()] * 5)
+        assert status == 200
+        status, body = await client.send([reading()] * 6)
+        assert status == 503
+        assert "queue full" in body["error"]
+        assert (await client.metrics())["throttled_batches"] == 1
+
+    # Long interval and row threshold: nothing is flushed while we fill the queue
+    run_service(db, scenario, max_queue_rows=10, flush_rows=100, flush_interval=60)
+
+
+def test_flushes_when_row_threshold_reached(tmp_path):
+    db = make_db(tmp_path)
+
+    async def scenario(service, client):
+        await client.send([reading()] * 9)
+        await asyncio.sleep(0.1)
+        assert service.stats["written_rows"] == 0
+        await client.send([reading()])
+        await wait_until(lambda: service.stats["written_rows"] == 10)
+        assert service.stats["flushes"] == 1
+
+    run_service(db, scenario, flush_rows=10, flush_interval=60)
+    assert stored_rows(db) == 10
+
+
+def test_flushes_on_interval(tmp_path):
+    db = make_db(tmp_path)
+
+    async def scenario(service, client):
+        await client.send([reading()] * 3)
+        await wait_until(lambda: service.stats["written_rows"] == 3)
+        assert (await client.metrics())["queue_depth_rows"] == 0
+
+    run_service(db, scenario, flush_rows=1000, flush_interval=0.05)
+    assert stored_rows(db) == 3
+
+
+def test_writer_survives_failed_write(tmp_path):
+    db = make_db(tmp_path, with_table=False)
+
+    async def scenario(service, client):
+        status, _ = await client.send([reading()] * 4)
+        assert status == 200
+        await wait_until(lambda: service.stats["failed_flushes"] >= 1)
+
+        metrics = await client.metrics()
+        assert metrics["healthy"] is False
+        assert "no such table" in metrics["last_error"]
+        assert metrics["queue_depth_rows"] == 4
+        status, body = await client.send([reading()])
+        assert status == 503
+        assert "writer unavailable" in body["error"]
+
+        # Once the table exists the requeued batch goes through on a retry
+        with sqlite3.connect(db) as conn:
+            conn.execute(SENSOR_TABLE)
+        await wait_until(lambda: service.stats["written_rows"] == 4)
+        assert service.healthy
+        status, _ = await client.send([reading()])
+        assert status == 200
+
+    run_service(db, scenario, flush_interval=0.02, max_retry_delay=0.1)
+    assert stored_rows(db) == 5
+
+
+def test_timestamps_are_normalised_for_compact_storage(tmp_path):
+    db = make_db(tmp_path)
+    conn = sqlite3.connect(db)
+    compact_storage.migrate(conn, vacuum=False)
+    conn.close()
+
+    async def scenario(service, client):
+        status, body = await client.send([reading(timestamp="2025-7-1 1:2:3")])
+        assert (status, body["accepted"]) == (200, 1)
+        await wait_until(lambda: service.stats["written_rows"] == 1)
+        assert service.healthy
+
+    run_service(db, scenario, flush_interval=0.02)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT timestamp FROM sensor_data").fetchall() == [("2025-07-01 01:02:03",)]
+
+
+def test_rows_refused_by_the_database_do_not_block_the_queue(tmp_path):
+    db = make_db(tmp_path, table_sql=SENSOR_TABLE.replace("value REAL", "value REAL CHECK (value < 1000)"))
+
+    async def scenario(service, client):
+        batch = [reading(value=v) for v in (1, 2, 5000, 3, 4, 6000, 5)]
+        status, body = await client.send(batch)
+        assert (status, body["accepted"]) == (200, 7)
+        await wait_until(lambda: service.stats["write_rejected_rows"] == 2)
+
+        metrics = await client.metrics()
+        assert metrics["healthy"] is True
+        assert metrics["written_rows"] == 5
+        assert metrics["queue_depth_rows"] == 0
+        assert "CHECK constraint failed" in metrics["last_write_rejection"]
+        status, _ = await client.send([reading(value=6)])
+        assert status == 200
+
+    run_service(db, scenario, flush_interval=0.02)
+    with sqlite3.connect(db) as conn:
+        values = [v for (v,) in conn.execute("SELECT value FROM sensor_data ORDER BY rowid")]
+    assert values == [1, 2, 3, 4, 5, 6]
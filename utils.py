@@ -2,6 +2,9 @@
 import sqlite3
 import pandas as pd
 import json
+import importlib.util
+
+from compact_storage import is_compact
 
 DB_PATH = "ga_maintenance.db"
 
@@ -12,6 +15,106 @@ def load_df(query):
     conn.close()
     return df
 
+def _decode(ids, lookup, id_col, name_col):
+    """Turn integer lookup codes into a pandas Categorical without string round trips."""
+    codes = pd.Index(lookup[id_col]).get_indexer(ids)
+    return pd.Categorical.from_codes(codes, categories=lookup[name_col])
+
+def load_sensor_data(params=None, db_path=None):
+    """Load sensor readings with tail_number/parameter/unit as categoricals and parsed timestamps.
+
+    Reads the dictionary-encoded sensor_data_compact table directly when present,
+    otherwise the plain sensor_data table.
+    """
+    conn = sqlite3.connect(db_path or DB_PATH)
+    try:
+        if is_compact(conn):
+            tails = pd.read_sql_query("SELECT tail_id, tail_number FROM tails", conn)
+            units = pd.read_sql_query("SELECT unit_id, name FROM sensor_units", conn)
+            param_lookup = pd.read_sql_query("SELECT param_id, name FROM sensor_params", conn)
+            query = """
+                SELECT sensor_id, tail_id, component_id, param_id, value, unit_id, ts, sensor_health
+                FROM sensor_data_compact
+            """
+            args = []
+            if params is not None:
+                args = param_lookup.loc[param_lookup["name"].isin(params), "param_id"].tolist()
+                query += f" WHERE param_id IN ({','.join('?' * len(args)) or 'NULL'})"
+            df = pd.read_sql_query(query, conn, params=args)
+            df["tail_number"] = _decode(df.pop("tail_id"), tails, "tail_id", "tail_number")
+            df["parameter"] = _decode(df.pop("param_id"), param_lookup, "param_id", "name")
+            df["unit"] = _decode(df.pop("unit_id"), units, "unit_id", "name")
+            df["timestamp"] = pd.to_datetime(df.pop("ts"), unit="s")
+        else:
+            query = "SELECT * FROM sensor_data"
+            args = []
+            if params is not None:
+                args = list(params)
+                query += f" WHERE parameter IN ({','.join('?' * len(args)) or 'NULL'})"
+            df = pd.read_sql_query(query, conn, params=args)
+            for col in ("tail_number", "parameter", "unit"):
+                df[col] = df[col].astype("category")
+            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    finally:
+        conn.close()
+    columns = ["tail_number", "component_id", "parameter", "value", "unit", "timestamp", "sensor_health"]
+    return df[[c for c in df.columns if c not in columns] + columns]
+
+# Rebuilds the sensor_data view inside DuckDB so the lookup joins and timestamp
+# decoding run vectorized there instead of through SQLite's view
+_COMPACT_SENSOR_VIEW = """
+    CREATE VIEW sensor_data AS
+    SELECT s.sensor_id, t.tail_number, s.component_id, p.name AS parameter, s.value,
+           u.name AS unit, make_timestamp(CAST(s.ts AS BIGINT) * 1000000) AS "timestamp", s.sensor_health
+    FROM fleet.sensor_data_compact s
+    JOIN fleet.sensor_params p ON p.param_id = s.param_id
+    LEFT JOIN fleet.sensor_units u ON u.unit_id = s.unit_id
+    LEFT JOIN fleet.tails t ON t.tail_id = s.tail_id
+"""
+_PLAIN_SENSOR_VIEW = """
+    CREATE VIEW sensor_data AS
+    SELECT * REPLACE (TRY_CAST("timestamp" AS TIMESTAMP) AS "timestamp")
+    FROM fleet.sensor_data
+"""
+
+def analytics_available():
+    """True when the optional DuckDB analytics engine is installed."""
+    return importlib.util.find_spec("duckdb") is not None
+
+def analytics_query(query, params=None, db_path=None, threads=None):
+    """Run an analytical query in DuckDB and return a pandas DataFrame.
+
+    The SQLite database is attached read-only, so heavy scans run vectorized and
+    multi-threaded without taking SQLite write locks. Tables keep their SQLite
+    names; sensor_data always has a parsed TIMESTAMP column, whichever storage
+    layout the database uses.
+
+    Once the database is attached, file access, ATTACH, extension installs
+    and configuration changes are locked, so ad-hoc queries can only read it.
+    """
+    try:
+        import duckdb  # optional and heavy; only the analytics page pays for it
+    except ImportError as e:
+        raise ImportError("The analytics engine needs DuckDB: pip install duckdb") from e
+    con = duckdb.connect()
+    try:
+        if threads:
+            con.execute(f"SET threads = {int(threads)}")
+        path = (db_path or DB_PATH).replace("'", "''")
+        con.execute(f"ATTACH '{path}' AS fleet (TYPE sqlite, READ_ONLY)")
+        compact = con.execute("""
+            SELECT count(*) FROM duckdb_tables()
+            WHERE database_name = 'fleet' AND table_name = 'sensor_data_compact'
+        """).fetchone()[0]
+        con.execute(_COMPACT_SENSOR_VIEW if compact else _PLAIN_SENSOR_VIEW)
+        # Our sensor_data view first, everything else straight from the SQLite file
+        con.execute("SET search_path = 'memory.main,fleet.main'")
+        con.execute("SET enable_external_access = false")
+        con.execute("SET lock_configuration = true")
+        return con.execute(query, params or []).df()
+    finally:
+        con.close()
+
 def validate_metrics(metrics_json):
     """Validate that a JSON string includes all required performance metric fields."""
     try: